@@ -0,0 +1 @@
+"""Bot Discord śledzący czas na kanałach głosowych i logujący go do JIRA"""
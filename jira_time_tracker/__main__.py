@@ -0,0 +1,62 @@
+import argparse
+import sys
+import threading
+
+from . import mappings, recorder
+from .settings import BOT_TOKEN
+
+
+# Główna funkcja
+def main():
+    parser = argparse.ArgumentParser(description="Discord JIRA Time Tracker")
+    subparsers = parser.add_subparsers(dest='command')
+    import_parser = subparsers.add_parser('import', help="Zaimportuj mapowania z pliku CSV lub JSON")
+    import_parser.add_argument('file')
+    export_parser = subparsers.add_parser('export', help="Wyeksportuj mapowania na standardowe wyjście")
+    export_parser.add_argument('--format', choices=['csv', 'json'], default='csv')
+    replay_parser = subparsers.add_parser('replay', help="Odtwórz nagranie zdarzeń (RECORD_FILE) z backendem zaślepką")
+    replay_parser.add_argument('file')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help="Mnożnik prędkości, 0 - bez czekania")
+    replay_parser.add_argument('--latency', type=float, default=0.0, help="Symulowany czas odpowiedzi JIRA (s)")
+    simulate_parser = subparsers.add_parser('simulate', help="Sprawdź budowanie worklogów na losowych sesjach")
+    simulate_parser.add_argument('--sessions', type=int, default=100000)
+    simulate_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        sys.exit(mappings.cli_import(args.file))
+    if args.command == 'export':
+        mappings.cli_export(args.format)
+        return
+    if args.command == 'replay':
+        from .replay import cli_replay
+        cli_replay(args.file, args.speed, args.latency)
+        return
+    if args.command == 'simulate':
+        from .simulate import cli_simulate
+        cli_simulate(args.sessions, args.seed)
+
+    from .discord_bot import bot
+    from .watcher import start_config_watcher
+    from .webhook import run_flask
+
+    # Przeładowuj tasks.json/config.json po każdej zmianie, bez restartu
+    stop_config_watcher = start_config_watcher()
+
+    # Opcjonalne nagrywanie zdarzeń (RECORD_FILE) do odtworzenia narzędziem replay
+    recorder.start()
+
+    # Uruchom Flask w osobnym wątku
+    flask_thread = threading.Thread(target=run_flask)
+    flask_thread.daemon = True  # Wątek zostanie zamknięty po zamknięciu głównego programu
+    flask_thread.start()
+
+    print("Serwer Flask uruchomiony!")
+
+    # Uruchom bota Discord w głównym wątku; SIGTERM kończy go łagodnie (graceful_shutdown)
+    bot.run(BOT_TOKEN)
+    stop_config_watcher()
+
+
+if __name__ == '__main__':
+    main()
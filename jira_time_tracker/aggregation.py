@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+
+from . import backends, clock
+from .settings import AGGREGATION_FILE, AGGREGATION_FLUSH_TIME, AGGREGATION_MODE
+from .storage import write_json_atomic
+from .worklog import WorklogEntry
+
+# Tryb agregacji: 'off' - każdy worklog od razu, 'daily' - jeden worklog na użytkownika, zadanie i dzień,
+# 'weekly' - jeden na użytkownika, zadanie i tydzień (wysyłany w piątek)
+ENABLED = AGGREGATION_MODE in ('daily', 'weekly')
+
+FLUSH_HOUR, FLUSH_MINUTE = (int(part) for part in AGGREGATION_FLUSH_TIME.split(':'))
+
+# Zebrane sesje: klucz (gildia, użytkownik, zadanie, okres) -> zagregowany worklog
+pending = {}
+# Worklogi w trakcie wysyłania - zapisywane na dysk razem z zebranymi, dopóki wysyłka się nie powiedzie
+in_flight = {}
+pending_lock = threading.Lock()
+
+
+def period_key(start_time):
+    """Zwróć okres, do którego należy sesja (data dnia albo poniedziałek tygodnia)
+
+    start_time jest już w strefie czasowej użytkownika, więc dzień liczy się według jego kalendarza.
+    """
+    day = start_time.date()
+    if AGGREGATION_MODE == 'weekly':
+        day -= timedelta(days=day.weekday())
+    return day.isoformat()
+
+
+def due_at(period, tzinfo):
+    """Zwróć moment wysłania zagregowanego worklogu: koniec dnia pracy użytkownika (dla tygodnia - w piątek)"""
+    day = date.fromisoformat(period)
+    if AGGREGATION_MODE == 'weekly':
+        day += timedelta(days=4)
+    return datetime.combine(day, time(FLUSH_HOUR, FLUSH_MINUTE), tzinfo=tzinfo)
+
+
+def is_due(key, bucket, now):
+    return due_at(key[-1], bucket['start_time'].tzinfo) <= now
+
+
+def bucket_key(entry):
+    # Gildia w kluczu - te same klucze zadań mogą istnieć w instancjach JIRA różnych gildii
+    return (entry.guild_id or '', entry.jira_account_id or entry.discord_name, entry.issue_key,
+            period_key(entry.start_time))
+
+
+def to_record(key, bucket):
+    return {
+        'key': list(key),
+        'issue_key': bucket['issue_key'],
+        'jira_account_id': bucket['jira_account_id'],
+        'discord_name': bucket['discord_name'],
+        'channel_names': sorted(bucket['channel_names']),
+        'start_time': bucket['start_time'].isoformat(),
+        'end_time': bucket['end_time'].isoformat(),
+        'duration_seconds': bucket['duration_seconds'],
+        'sessions': bucket['sessions'],
+        'guild_id': bucket['guild_id'],
+    }
+
+
+def load_time(value):
+    """Wczytaj zapisany czas; czas ze strefą pozostaje bez zmian"""
+    moment = datetime.fromisoformat(value)
+    # Zapisy sprzed obsługi stref czasowych nie mają przesunięcia - traktuj je jako czas serwera
+    return moment.astimezone() if moment.tzinfo is None else moment
+
+
+def from_record(record):
+    bucket = dict(record)
+    key = tuple(bucket.pop('key'))
+    # Zapisy sprzed obsługi wielu gildii - klucz bez gildii, dane domyślne
+    if len(key) == 3:
+        key = ('',) + key
+    bucket.setdefault('guild_id', None)
+    bucket['channel_names'] = set(bucket['channel_names'])
+    bucket['start_time'] = load_time(bucket['start_time'])
+    bucket['end_time'] = load_time(bucket['end_time'])
+    return key, bucket
+
+
+def save_pending():
+    """Zapisz zebrane i jeszcze niewysłane sesje na dysk, żeby przetrwały restart (wywoływać z pending_lock)"""
+    records = [to_record(key, bucket) for key, bucket in in_flight.items()]
+    records += [to_record(key, bucket) for key, bucket in pending.items()]
+    try:
+        write_json_atomic(AGGREGATION_FILE, records)
+    except Exception as e:
+        print(f"Błąd zapisywania zagregowanych worklogów: {e}")
+
+
+def load_pending():
+    """Wczytaj zebrane sesje zapisane przed restartem"""
+    if not os.path.exists(AGGREGATION_FILE):
+        return
+    try:
+        with open(AGGREGATION_FILE, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        with pending_lock:
+            for record in records:
+                # Ten sam klucz może wystąpić dwa razy: worklog w trakcie wysyłania i sesje dodane w tym czasie
+                merge(*from_record(record))
+        print(f"Wczytano {len(records)} zagregowanych worklogów oczekujących na wysłanie")
+    except Exception as e:
+        print(f"Błąd wczytywania zagregowanych worklogów: {e}")
+
+
+def merge(key, bucket):
+    """Dołącz zagregowany worklog do zebranych (wywoływać z pending_lock)"""
+    current = pending.get(key)
+    if current is None:
+        pending[key] = bucket
+        return bucket
+
+    current['channel_names'] |= bucket['channel_names']
+    current['start_time'] = min(current['start_time'], bucket['start_time'])
+    current['end_time'] = max(current['end_time'], bucket['end_time'])
+    current['duration_seconds'] += bucket['duration_seconds']
+    current['sessions'] += bucket['sessions']
+    return current
+
+
+def add_entry(entry):
+    """Dodaj zakończoną sesję do zagregowanego worklogu; zwraca łączny czas w sekundach"""
+    bucket = {
+        'issue_key': entry.issue_key,
+        'jira_account_id': entry.jira_account_id,
+        'discord_name': entry.discord_name,
+        'channel_names': {entry.channel_name},
+        'start_time': entry.start_time,
+        'end_time': entry.end_time,
+        'duration_seconds': entry.duration_seconds,
+        'sessions': 1,
+        'guild_id': entry.guild_id,
+    }
+    with pending_lock:
+        total = merge(bucket_key(entry), bucket)['duration_seconds']
+        save_pending()
+    return total
+
+
+def to_entry(bucket):
+    """Zamień zagregowany worklog na WorklogEntry dla backendu"""
+    return WorklogEntry(
+        issue_key=bucket['issue_key'],
+        start_time=bucket['start_time'],
+        end_time=bucket['end_time'],
+        duration_seconds=bucket['duration_seconds'],
+        jira_account_id=bucket['jira_account_id'],
+        discord_name=bucket['discord_name'],
+        channel_name=", ".join(sorted(bucket['channel_names'])),
+        guild_id=bucket['guild_id']
+    )
+
+
+async def flush(force=False, now=None):
+    """Wyślij zagregowane worklogi, których okres się zakończył
+
+    Plik jest zapisywany po każdym wysłanym worklogu, więc po awarii w trakcie wysyłania ponownie
+    wysyłane są tylko worklogi jeszcze niepotwierdzone. Nieudane worklogi wracają do zebranych
+    i zostaną wysłane przy kolejnej próbie. Zwraca (liczba_wysłanych, liczba_nieudanych).
+    """
+    now = now or clock.utc_now()
+    with pending_lock:
+        due = {key: bucket for key, bucket in pending.items() if force or is_due(key, bucket, now)}
+        for key in due:
+            in_flight[key] = pending.pop(key)
+
+    sent = 0
+    failed = 0
+    for key, bucket in due.items():
+        entry = to_entry(bucket)
+        try:
+            await backends.submit_worklog(entry)
+        except Exception as e:
+            failed += 1
+            print(f"Błąd wysyłania zagregowanego worklogu {entry.issue_key}: {e}")
+            with pending_lock:
+                del in_flight[key]
+                merge(key, bucket)
+                save_pending()
+            continue
+
+        sent += 1
+        with pending_lock:
+            del in_flight[key]
+            save_pending()
+        print(f"Wysłano zagregowany worklog: {entry.time_spent} w {entry.issue_key} "
+              f"dla {entry.jira_account_id or entry.discord_name} ({bucket['sessions']} sesji)")
+    return sent, failed
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import threading
+from dataclasses import asdict
+
+from .jira_client import run_blocking
+from .tenants import get_tenant
+from .settings import WORKLOG_BACKEND, WORKLOG_FILE
+from .worklog import parse_time_spent
+
+
+class WorklogBackend:
+    """Interfejs backendu zapisującego worklogi
+
+    Metoda submit jest korutyną wykonywaną na pętli zdarzeń Discord (webhook przekazuje ją
+    tam przez run_sync). Zwraca dopisek do powiadomienia użytkownika (może być pusty), a gdy
+    zapisanie czasu się nie powiodło, rzuca wyjątek.
+    """
+    name = None
+
+    async def submit(self, entry):
+        raise NotImplementedError
+
+
+async def add_worklog_with_comment(entry, who):
+    """Dodaj worklog jako admin z informacją o użytkowniku w komentarzu"""
+    await get_tenant(entry.guild_id).jira.add_worklog(
+        entry.issue_key,
+        entry.time_spent,
+        f"Auto log Discord dla {who} - kanał: {entry.channel_name} ({entry.time_range})",
+        started=entry.start_time
+    )
+    print(f"Dodano worklog do JIRA z komentarzem o użytkowniku {who}")
+
+
+class TempoBackend(WorklogBackend):
+    """Rejestracja czasu przez Tempo API, z awaryjnym worklogiem JIRA"""
+    name = 'tempo'
+
+    async def log_time_via_tempo(self, entry):
+        """
+        Rejestruj czas pracy przez Tempo REST API
+
+        :param entry: WorklogEntry z kluczem zadania, Account ID i rzeczywistym czasem startu
+        """
+        tenant = get_tenant(entry.guild_id)
+        try:
+            # Pobierz ID zadania z JIRA (tylko potrzebne pole, bez pełnego zadania)
+            issue = await tenant.jira.issue(entry.issue_key, fields='key')
+
+            # Dane dla API Tempo używające rzeczywistego czasu startu
+            worklog_data = {
+                "issueId": issue['id'],
+                "timeSpentSeconds": entry.duration_seconds,
+                "startDate": entry.start_time.strftime("%Y-%m-%d"),
+                "startTime": entry.start_time.strftime("%H:%M:%S"),
+                "authorAccountId": entry.jira_account_id,
+                "description": entry.description
+            }
+
+            # Debug - wypisz dokładne dane wysyłane do API
+            print(f"Wysyłanie danych do API Tempo: {worklog_data}")
+
+            _, _, data = await tenant.tempo.request('POST', '/4/worklogs', json_data=worklog_data, expected=(200, 201))
+            print(f"Czas zarejestrowany pomyślnie przez Tempo dla {entry.jira_account_id}")
+            return data
+        except Exception as e:
+            print(f"Wyjątek podczas rejestrowania czasu przez Tempo: {e}")
+            return None
+
+    async def submit(self, entry):
+        if not entry.jira_account_id:
+            await add_worklog_with_comment(entry, entry.discord_name)
+            return ""
+
+        if await self.log_time_via_tempo(entry):
+            return ""
+
+        # Próba alternatywna - standardowe API JIRA
+        await add_worklog_with_comment(entry, entry.discord_name)
+        return "rejestracja przez standardowe API z informacją o tobie w komentarzu"
+
+
+class JiraBackend(WorklogBackend):
+    """Rejestracja czasu bezpośrednio w JIRA, z próbą ustawienia autora worklogu"""
+    name = 'jira'
+
+    async def submit(self, entry):
+        if not entry.jira_account_id:
+            await add_worklog_with_comment(entry, entry.discord_name)
+            return ""
+
+        jira_username = entry.jira_account_id
+
+        # Próba 1: Worklog z autorem ustawionym na zmapowanego użytkownika
+        try:
+            await get_tenant(entry.guild_id).jira.add_worklog(
+                entry.issue_key,
+                entry.time_spent,
+                entry.description,
+                started=entry.start_time,
+                author_account_id=jira_username
+            )
+            print(f"Dodano worklog do JIRA jako {jira_username}")
+            return f"jako użytkownik JIRA: {jira_username}"
+        except Exception as e:
+            print(f"Nie udało się dodać worklogu jako {jira_username}: {e}")
+
+        # Próba 2: Standardowy worklog z informacją w komentarzu
+        await add_worklog_with_comment(entry, jira_username)
+        return (f"nie udało się zalogować bezpośrednio jako {jira_username}, czas został zalogowany "
+                f"przez bota z informacją o tobie w komentarzu")
+
+
+class FileBackend(WorklogBackend):
+    """Zapis worklogów do lokalnego pliku JSONL - do testów i pomiarów bez JIRA"""
+    name = 'file'
+
+    def __init__(self, path=WORKLOG_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, line):
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+    async def submit(self, entry):
+        record = asdict(entry)
+        record['start_time'] = entry.start_time.isoformat()
+        record['end_time'] = entry.end_time.isoformat()
+        record['time_spent'] = entry.time_spent
+
+        await run_blocking(self.write, json.dumps(record, ensure_ascii=False))
+        return f"zapisano lokalnie w {self.path}"
+
+
+class StubBackend(WorklogBackend):
+    """Symulacja JIRA w pamięci - do odtwarzania nagrań, symulacji i pomiarów bez JIRA
+
+    Jak JIRA odrzuca worklogi z nieprawidłowym czasem (np. "12.5m", "0m") i sumuje zapisany
+    czas (w minutach, po zaokrągleniu) dla każdej pary zadanie, użytkownik.
+    """
+    name = 'stub'
+
+    def __init__(self, latency=0.0, keep_entries=True):
+        # Sztuczne opóźnienie (w sekundach) symulujące czas odpowiedzi JIRA
+        self.latency = latency
+        # Przy długich symulacjach wystarczą sumy - bez przechowywania każdego worklogu
+        self.keep_entries = keep_entries
+        self.entries = []
+        self.totals = {}  # (zadanie, użytkownik) -> minuty
+
+    def record(self, entry):
+        """Zapisz worklog w pamięci (bez opóźnienia); zwraca zapisany czas w minutach"""
+        minutes = parse_time_spent(entry.time_spent)
+        if minutes <= 0:
+            raise ValueError(f"Nieprawidłowy czas worklogu: {entry.time_spent!r}")
+        key = (entry.issue_key, entry.jira_account_id or entry.discord_name)
+        self.totals[key] = self.totals.get(key, 0) + minutes
+        if self.keep_entries:
+            self.entries.append(entry)
+        return minutes
+
+    async def submit(self, entry):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.record(entry)
+        return "zaślepka - worklog nie został wysłany"
+
+
+BACKENDS = {
+    TempoBackend.name: TempoBackend,
+    JiraBackend.name: JiraBackend,
+    FileBackend.name: FileBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+def create_backend(name=WORKLOG_BACKEND):
+    """Utwórz backend worklogów o podanej nazwie"""
+    if name not in BACKENDS:
+        raise ValueError(f"Nieznany backend worklogów: {name} (dostępne: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+# Aktywny backend wybrany w konfiguracji (WORKLOG_BACKEND)
+backend = create_backend()
+
+
+async def submit_worklog(entry):
+    """Wyślij worklog aktywnym backendem w kolejce gildii (limit jednoczesnych wysyłek na gildię)"""
+    return await get_tenant(entry.guild_id).run(backend.submit(entry))
@@ -0,0 +1,31 @@
+import time
+from datetime import datetime, timezone
+
+
+class SystemClock:
+    """Zegar systemowy: czas UTC do worklogów i zegar monotoniczny do mierzenia czasu trwania"""
+
+    def utc_now(self):
+        return datetime.now(timezone.utc)
+
+    def monotonic(self):
+        return time.monotonic()
+
+
+# Aktywny zegar - narzędzie replay podmienia go na zegar wirtualny z nagrania
+current = SystemClock()
+
+
+def set_clock(clock):
+    global current
+    current = clock
+
+
+def utc_now():
+    """Zwróć bieżący czas jako datetime ze strefą UTC"""
+    return current.utc_now()
+
+
+def monotonic():
+    """Zwróć odczyt zegara monotonicznego w sekundach"""
+    return current.monotonic()
@@ -0,0 +1,229 @@
+import bisect
+from collections import Counter
+
+from . import tenants
+from .jira_client import ApiError, jira
+
+# Lokalny katalog użytkowników JIRA z indeksem prefiksowym i trigramowym.
+# Struktury są budowane od nowa przy odświeżeniu i podmieniane jednym przypisaniem,
+# więc odczyty (komendy, autocomplete) nigdy nie widzą częściowo zbudowanego indeksu.
+jira_users = {}  # accountId -> {'accountId', 'displayName', 'email', 'timeZone'}
+jira_user_prefixes = []  # posortowana lista (token, accountId)
+jira_user_trigrams = {}  # trigram -> set(accountId)
+# Kolejne strony listy użytkowników z ostatniego pobrania: (ETag, liczba wpisów, użytkownicy)
+jira_user_pages = []
+
+JIRA_USERS_PAGE_SIZE = 1000
+
+
+def user_tokens(user):
+    """Zwróć tokeny wyszukiwania użytkownika: słowa nazwy, email i Account ID"""
+    tokens = set(user['displayName'].lower().split())
+    tokens.add(user['displayName'].lower())
+    if user['email']:
+        tokens.add(user['email'].lower())
+    tokens.add(user['accountId'].lower())
+    return tokens
+
+
+def trigrams(text):
+    """Zwróć zbiór trigramów tekstu"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def directory_user(user):
+    """Zapisz użytkownika JIRA w postaci używanej w katalogu"""
+    return {
+        'accountId': user['accountId'],
+        'displayName': user.get('displayName', user['accountId']),
+        'email': user.get('emailAddress', ''),
+        'timeZone': user.get('timeZone')
+    }
+
+
+async def fetch_jira_users():
+    """Pobierz stronami wszystkich aktywnych użytkowników JIRA
+
+    Każda strona jest pobierana z własnym ETagiem - niezmieniona (304) jest brana z poprzedniego pobrania.
+    Zwraca listę użytkowników albo None, jeśli JIRA potwierdziła, że żadna strona się nie zmieniła.
+    """
+    global jira_user_pages
+
+    pages = []
+    changed = False
+    start_at = 0
+    while True:
+        cached = jira_user_pages[len(pages)] if len(pages) < len(jira_user_pages) else None
+        status, headers, page = await jira.users_page(start_at, JIRA_USERS_PAGE_SIZE, cached and cached[0])
+        if status == 304:
+            pages.append(cached)
+        else:
+            changed = True
+            pages.append((headers.get('ETag'), len(page), [
+                directory_user(user) for user in page
+                if user.get('accountType') == 'atlassian' and user.get('active', True)
+            ]))
+
+        page_size = pages[-1][1]
+        if page_size < JIRA_USERS_PAGE_SIZE:
+            break
+        start_at += page_size
+
+    # Mniej stron niż poprzednio (usunięci użytkownicy) też jest zmianą
+    changed = changed or len(pages) != len(jira_user_pages)
+    jira_user_pages = pages
+    if not changed:
+        return None
+    return [user for _, _, users in pages for user in users]
+
+
+def rebuild_jira_user_directory(users):
+    """Zbuduj indeksy dla podanych użytkowników i opublikuj je"""
+    global jira_users, jira_user_prefixes, jira_user_trigrams
+
+    new_users = {}
+    new_prefixes = []
+    new_trigrams = {}
+    for user in users:
+        new_users[user['accountId']] = user
+        for token in user_tokens(user):
+            new_prefixes.append((token, user['accountId']))
+            for trigram in trigrams(token):
+                new_trigrams.setdefault(trigram, set()).add(user['accountId'])
+    new_prefixes.sort()
+
+    jira_users, jira_user_prefixes, jira_user_trigrams = new_users, new_prefixes, new_trigrams
+
+
+def remember_jira_users(users):
+    """Dopisz do katalogu użytkowników znalezionych wyszukiwaniem na żywo
+
+    Dopisywani są tylko nowi użytkownicy, do kopii indeksów (bez przebudowy całego katalogu w pętli
+    zdarzeń); istniejących aktualizuje okresowe odświeżanie.
+    """
+    global jira_users, jira_user_prefixes, jira_user_trigrams
+
+    new_users = [directory_user(user) for user in users if user['accountId'] not in jira_users]
+    if not new_users:
+        return
+
+    merged = dict(jira_users)
+    prefixes = list(jira_user_prefixes)
+    trigram_index = dict(jira_user_trigrams)
+    for user in new_users:
+        merged[user['accountId']] = user
+        for token in user_tokens(user):
+            bisect.insort(prefixes, (token, user['accountId']))
+            for trigram in trigrams(token):
+                # Nowy zbiór zamiast dopisywania - stary indeks może właśnie być czytany
+                trigram_index[trigram] = trigram_index.get(trigram, frozenset()) | {user['accountId']}
+
+    jira_users, jira_user_prefixes, jira_user_trigrams = merged, prefixes, trigram_index
+
+
+def lookup_jira_users(query, limit=25):
+    """Znajdź użytkowników w lokalnym katalogu: najpierw dopasowania prefiksowe, potem przybliżone"""
+    query = query.lower().strip()
+    users, prefixes, trigram_index = jira_users, jira_user_prefixes, jira_user_trigrams
+    if not query:
+        return sorted(users.values(), key=lambda user: user['displayName'].lower())[:limit]
+
+    # Dopasowania prefiksowe (bisect po posortowanej liście tokenów)
+    found = []
+    seen = set()
+    position = bisect.bisect_left(prefixes, (query, ''))
+    while position < len(prefixes) and prefixes[position][0].startswith(query):
+        account_id = prefixes[position][1]
+        if account_id not in seen:
+            seen.add(account_id)
+            found.append(users[account_id])
+        position += 1
+    found.sort(key=lambda user: user['displayName'].lower())
+
+    # Dopasowania przybliżone (literówki, fragmenty) na podstawie wspólnych trigramów
+    query_trigrams = trigrams(query)
+    if len(found) < limit and query_trigrams:
+        scores = Counter()
+        for trigram in query_trigrams:
+            scores.update(trigram_index.get(trigram, ()))
+        threshold = len(query_trigrams) / 3
+        for account_id, score in scores.most_common():
+            if score < threshold:
+                break
+            if account_id not in seen:
+                seen.add(account_id)
+                found.append(users[account_id])
+
+    return found[:limit]
+
+
+async def search_jira_users(search_term, tenant=None):
+    """Wyszukaj użytkowników w lokalnym katalogu, a gdy nic nie znaleziono - na żywo w JIRA
+
+    Katalog zawiera użytkowników domyślnej JIRA - gildie z własnymi danymi szukają tylko w swojej JIRA,
+    żeby nie widzieć użytkowników innej organizacji.
+    """
+    if tenant is not None and tenant is not tenants.default_tenant:
+        return [directory_user(user) for user in await tenant.jira.search_users(search_term)]
+
+    users = lookup_jira_users(search_term, limit=10)
+    if users:
+        return users
+
+    found = await jira.search_users(search_term)
+    remember_jira_users(found)
+    return [jira_users[user['accountId']] for user in found]
+
+
+def format_jira_users(search_term, users):
+    """Sformatuj listę użytkowników JIRA do wiadomości"""
+    message = f"Znalezieni użytkownicy JIRA dla zapytania '{search_term}':\n"
+    for user in users:
+        message += f"- Nazwa: {user['displayName']}\n"
+        message += f"  Email: {user['email'] or 'Brak'}\n"
+        message += f"  Account ID: `{user['accountId']}`\n\n"
+    return message
+
+
+def validate_jira_account_id(jira_account_id):
+    """Sprawdź Account ID w katalogu; zwraca komunikat błędu albo None"""
+    if not jira_users:
+        # Katalog jeszcze nie wczytany - nie blokuj mapowania
+        return None
+    if jira_account_id not in jira_users:
+        return (f"Nie znaleziono użytkownika JIRA o Account ID `{jira_account_id}`. "
+                f"Użyj !find_jira_account_id, aby znaleźć poprawne ID.")
+    return None
+
+
+async def check_jira_account_id(jira_account_id, tenant):
+    """Sprawdź Account ID w JIRA gildii; zwraca komunikat błędu albo None
+
+    Katalog dotyczy tylko domyślnej JIRA - gildie z własnymi danymi pytają swoją JIRA o użytkownika.
+    """
+    if tenant is tenants.default_tenant:
+        return validate_jira_account_id(jira_account_id)
+    try:
+        await tenant.jira.user(jira_account_id)
+    except ApiError as e:
+        if e.status == 404:
+            return (f"Nie znaleziono użytkownika JIRA o Account ID `{jira_account_id}`. "
+                    f"Użyj !find_jira_account_id, aby znaleźć poprawne ID.")
+        # JIRA gildii niedostępna - nie blokuj mapowania
+        print(f"Nie udało się sprawdzić użytkownika JIRA {jira_account_id}: {e}")
+    except Exception as e:
+        print(f"Nie udało się sprawdzić użytkownika JIRA {jira_account_id}: {e}")
+    return None
+
+
+async def autocomplete_jira_users(current, tenant):
+    """Podpowiedzi użytkowników JIRA gildii: z lokalnego katalogu albo (gildie z własną JIRA) na żywo"""
+    if tenant is tenants.default_tenant:
+        return lookup_jira_users(current)
+    if not current.strip():
+        return []
+    try:
+        return [directory_user(user) for user in await tenant.jira.search_users(current, max_results=25)]
+    except Exception as e:
+        print(f"Błąd podpowiedzi użytkowników JIRA: {e}")
+        return []
@@ -0,0 +1,926 @@
+import asyncio
+import io
+import signal
+import time
+from datetime import datetime, timedelta
+
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from . import (
+    aggregation, backends, clock, directory, mappings, meetings, outbox, recorder, storage, tenants, timezones,
+    webhook
+)
+from .jira_client import ApiError, close_clients, jira, run_blocking
+from .routing import describe_rule
+from .settings import (
+    DISCORD_MEMBER_CACHE, JIRA_USER_REFRESH_MINUTES, LEAN_MODE, MEETING_SUBMIT_CONCURRENCY, MEETING_SUMMARY_CHANNEL,
+    SHUTDOWN_GRACE, SHUTDOWN_TIMEOUT
+)
+from .worklog import build_entry, format_time_spent
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Ustaw wszystkie wymagane intencje
+intents = discord.Intents.default()
+intents.voice_states = True
+intents.members = not LEAN_MODE
+intents.message_content = not LEAN_MODE
+
+if LEAN_MODE:
+    # Bez message_content komendy prefiksowe działają po wzmiance bota (oraz w DM)
+    bot = commands.Bot(
+        command_prefix=commands.when_mentioned_or('!'),
+        intents=intents,
+        member_cache_flags=discord.MemberCacheFlags.from_intents(intents),
+        chunk_guilds_at_startup=False
+    )
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents)
+
+# Dane o aktywnych sesjach użytkowników. Czas rozpoczęcia jest zapisywany w UTC (do worklogu),
+# a czas trwania mierzony zegarem monotonicznym - odporny na zmiany czasu (DST, NTP)
+active_sessions = {}
+
+# Maksymalna długość wiadomości Discord (podsumowanie spotkania jest przycinane)
+MESSAGE_LIMIT = 2000
+
+# Ile worklogów wysyłać jednocześnie przy zamykaniu bota
+SHUTDOWN_WORKERS = 4
+shutting_down = False
+background_tasks = set()
+
+
+def new_session(member, channel, task_info):
+    return {
+        'channel_id': str(channel.id),
+        'channel_name': channel.name,
+        'guild_id': str(channel.guild.id) if channel.guild else None,
+        'discord_name': member.name,
+        'start_time': clock.utc_now(),
+        'start_monotonic': clock.monotonic(),
+        'task_info': task_info
+    }
+
+
+def close_session(discord_id, session, snapshot):
+    """Zakończ sesję teraz i zwróć worklog (w UTC) albo None, jeśli sesja była zbyt krótka"""
+    start_time = session['start_time']  # Rzeczywisty czas rozpoczęcia (UTC)
+    duration = timedelta(seconds=clock.monotonic() - session['start_monotonic'])
+    end_time = start_time + duration
+    duration_minutes = round(duration.total_seconds() / 60, 2)
+
+    print(
+        f"Czas spędzony: {duration_minutes} minut, od {start_time.strftime('%H:%M:%S')} "
+        f"do {end_time.strftime('%H:%M:%S')} UTC")
+
+    if duration_minutes < 0.1:  # Zmniejszamy próg do 0.1 min dla testów
+        print(f"Nie dodano worklogu: czas zbyt krótki ({duration_minutes} min)")
+        return None
+
+    return build_entry(
+        issue_key=session['task_info']['zadanie'],
+        start_time=start_time,
+        duration_seconds=duration.total_seconds(),
+        jira_account_id=snapshot.user_mappings.get(str(discord_id)),
+        discord_name=session['discord_name'],
+        channel_name=session['channel_name'],
+        guild_id=session['guild_id']
+    )
+
+
+# Funkcje pomocnicze
+def match_choices(values, current, limit=25):
+    """Zwróć podpowiedzi zaczynające się od wpisanego tekstu (Discord przyjmuje maks. 25)"""
+    current = current.lower()
+    matches = [value for value in values if value.lower().startswith(current)]
+    return sorted(matches)[:limit]
+
+
+def memory_usage_mb():
+    """Zwróć maksymalne zużycie pamięci procesu w MB (lub None, jeśli niedostępne)"""
+    if resource is None:
+        return None
+    # Na Linuksie ru_maxrss jest w KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def resolve_discord_name(discord_id):
+    """Znajdź nazwę użytkownika Discord, w razie potrzeby pobierając go z API"""
+    user_id = int(discord_id)
+    for guild in bot.guilds:
+        user = guild.get_member(user_id)
+        if user:
+            return user.name
+
+    # W trybie oszczędnym członkowie nie są w cache - pobierz użytkownika na żądanie
+    user = bot.get_user(user_id)
+    if user is None:
+        try:
+            user = await bot.fetch_user(user_id)
+        except discord.HTTPException:
+            return "Nieznany"
+    return user.name
+
+
+def tenant_of(guild):
+    """Zwróć najemcę (klientów JIRA/Tempo) gildii; w wiadomościach prywatnych - domyślnego"""
+    return tenants.get_tenant(guild.id if guild else None)
+
+
+async def notify(member, message):
+    """Wyślij wiadomość prywatną, ignorując użytkowników z zablokowanymi DM"""
+    try:
+        await member.send(message)
+    except Exception as e:
+        print(f"Nie można wysłać wiadomości do {member.name}: {e}")
+
+
+@tasks.loop(minutes=JIRA_USER_REFRESH_MINUTES)
+async def refresh_jira_user_directory():
+    """Okresowo odświeżaj lokalny katalog użytkowników JIRA w tle"""
+    # Gdy JIRA była niedostępna przy starcie, spróbuj połączyć się ponownie
+    if not jira.connected and not await jira.check_connection():
+        return
+    try:
+        users = await directory.fetch_jira_users()
+        if users is None:
+            print("Katalog użytkowników JIRA bez zmian")
+            return
+        await run_blocking(directory.rebuild_jira_user_directory, users)
+        print(f"Odświeżono katalog użytkowników JIRA: {len(users)} użytkowników")
+    except Exception as e:
+        print(f"Błąd odświeżania katalogu użytkowników JIRA: {e}")
+
+
+@tasks.loop(minutes=1)
+async def flush_aggregated_worklogs():
+    """Wysyłaj zagregowane worklogi po zakończeniu dnia (tygodnia) pracy"""
+    sent, failed = await aggregation.flush()
+    if sent or failed:
+        print(f"Zagregowane worklogi: wysłano {sent}, nieudanych {failed}")
+
+
+@tasks.loop(minutes=5)
+async def evict_idle_tenants():
+    """Zamykaj pule połączeń gildii, które od dawna nie wysyłały worklogów"""
+    await tenants.evict_idle()
+
+
+async def submit_entry(entry, projekt=None, member=None):
+    """Wyślij worklog (albo dodaj go do agregacji) i powiadom użytkownika, jeśli podano
+
+    Zwraca (powodzenie, treść powiadomienia).
+    """
+    original = entry
+    with outbox.tracking(entry):
+        # Czasy w strefie czasowej użytkownika JIRA (startDate/startTime w Tempo, dzień agregacji)
+        entry = await timezones.localize(entry)
+
+        print(f"Próba dodania czasu: {entry.time_spent} do zadania {entry.issue_key} "
+              f"jako {entry.jira_account_id or entry.discord_name}")
+
+        if aggregation.ENABLED:
+            # Sesja trafia do zbiorczego worklogu wysyłanego na koniec dnia (tygodnia)
+            total_seconds = await run_blocking(aggregation.add_entry, entry)
+            message = (f"Dodano {entry.time_spent} do zbiorczego worklogu zadania {entry.issue_key} "
+                       f"projektu {projekt} (łącznie {format_time_spent(total_seconds / 60)}, "
+                       f"wysyłka o {aggregation.AGGREGATION_FLUSH_TIME})")
+        else:
+            try:
+                note = await backends.submit_worklog(entry)
+            except Exception as e:
+                error_message = f"Nie udało się zalogować czasu: {str(e)}"
+                print(error_message)
+                if shutting_down:
+                    # Ponowna próba przy następnym starcie
+                    outbox.defer(original)
+                if member:
+                    await notify(member, error_message)
+                return False, error_message
+
+            message = (f"Zarejestrowano {entry.time_spent} w zadaniu {entry.issue_key} projektu {projekt} "
+                       f"({entry.time_range})")
+            if note:
+                message += f" - {note}"
+
+    if entry.jira_account_id is None:
+        message += ". Nie znaleziono mapowania twojego konta Discord do konta JIRA."
+    if member:
+        await notify(member, message)
+    return True, message
+
+
+def meeting_summary_channel(guild):
+    """Zwróć kanał podsumowań spotkań, jeśli należy do gildii spotkania"""
+    channel = bot.get_channel(int(MEETING_SUMMARY_CHANNEL))
+    if channel is None or guild is None or channel.guild.id != guild.id:
+        return None
+    return channel
+
+
+def format_meeting_summary(channel, segments, results):
+    """Zbuduj podsumowanie spotkania (przycięte do limitu długości wiadomości Discord)"""
+    total_seconds = sum(entry.duration_seconds for entry, _, _ in segments)
+    failed = sum(1 for success, _ in results if not success)
+    header = (f"Spotkanie na kanale {channel.name} zakończone: {len(segments)} worklogów, "
+              f"łącznie {format_time_spent(total_seconds / 60)}")
+    if failed:
+        header += f", nieudanych: {failed}"
+
+    lines = []
+    for (entry, _, _), (success, message) in zip(segments, results):
+        status = f"{entry.time_spent} w {entry.issue_key}" if success else message
+        lines.append(f"- {entry.discord_name}: {status}")
+
+    summary = header
+    for index, line in enumerate(lines):
+        remaining = f"\n... i {len(lines) - index} kolejnych"
+        if len(summary) + 1 + len(line) + len(remaining) > MESSAGE_LIMIT:
+            return summary + remaining
+        summary += "\n" + line
+    return summary
+
+
+async def close_meeting(channel, segments):
+    """Wyślij jednocześnie worklogi wszystkich uczestników zakończonego spotkania i opublikuj podsumowanie"""
+    semaphore = asyncio.Semaphore(MEETING_SUBMIT_CONCURRENCY)
+
+    async def submit(entry, projekt, member):
+        async with semaphore:
+            return await submit_entry(entry, projekt)
+
+    print(f"Spotkanie na kanale {channel.name} zakończone, wysyłanie {len(segments)} worklogów")
+    results = await asyncio.gather(*(submit(*segment) for segment in segments))
+
+    summary_channel = meeting_summary_channel(channel.guild)
+    if summary_channel is None:
+        # Kanał podsumowań niedostępny w tej gildii - powiadom uczestników osobno
+        for (_, _, member), (_, message) in zip(segments, results):
+            if member:
+                await notify(member, message)
+        return
+
+    try:
+        await summary_channel.send(format_meeting_summary(channel, segments, results))
+    except Exception as e:
+        print(f"Nie można wysłać podsumowania spotkania na kanał {summary_channel.name}: {e}")
+
+
+async def end_session(discord_id, member, session, channel, snapshot):
+    """Zakończ sesję użytkownika, który opuścił kanał: wyślij worklog albo dołącz go do spotkania
+
+    member i channel mogą być None (użytkownik lub kanał zniknęli, gdy bot był rozłączony).
+    """
+    entry = close_session(discord_id, session, snapshot)
+    projekt = session['task_info']['projekt']
+    if not MEETING_SUMMARY_CHANNEL:
+        if entry is not None:
+            await submit_entry(entry, projekt, member)
+        return
+
+    # Segment czeka na koniec spotkania; ostatni wychodzący wysyła worklogi wszystkich uczestników
+    segments = meetings.leave(session['channel_id'], discord_id,
+                              (entry, projekt, member) if entry is not None else None)
+    if not segments:
+        return
+    if channel is None:
+        # Kanał usunięty - bez podsumowania, każdy worklog osobno
+        for entry, projekt, participant in segments:
+            await submit_entry(entry, projekt, participant)
+        return
+    await close_meeting(channel, segments)
+
+
+async def already_logged(entry):
+    """Sprawdź, czy JIRA ma już worklog użytkownika o tym samym czasie rozpoczęcia"""
+    try:
+        worklogs = await tenants.get_tenant(entry.guild_id).jira.worklogs(entry.issue_key)
+    except Exception as e:
+        print(f"Nie można sprawdzić worklogów zadania {entry.issue_key}: {e}")
+        return False
+
+    # Worklog jako użytkownik (autor) albo jako admin z użytkownikiem w komentarzu
+    who = {entry.jira_account_id, entry.discord_name} - {None, ''}
+    for worklog in worklogs:
+        try:
+            started = datetime.strptime(worklog['started'], "%Y-%m-%dT%H:%M:%S.%f%z")
+        except (KeyError, ValueError):
+            continue
+        if abs((started - entry.start_time).total_seconds()) >= 60:
+            continue
+        author = (worklog.get('author') or {}).get('accountId')
+        comment = worklog.get('comment') or ''
+        if author in who or any(name in comment for name in who):
+            return True
+    return False
+
+
+async def resend_unsent_worklogs(records):
+    """Wyślij worklogi, których nie zdążono wysłać przed poprzednim zamknięciem bota"""
+    for entry, interrupted in records:
+        # Wysyłanie przerwane przy zamykaniu mogło dotrzeć do JIRA - nie dubluj worklogu
+        if interrupted and await already_logged(entry):
+            print(f"Pominięto worklog {entry.issue_key} z {entry.start_time} - już jest w JIRA")
+            continue
+        await submit_entry(entry)
+
+
+async def graceful_shutdown():
+    """Zamknij bota bez utraty czasu pracy
+
+    Webhook przestaje przyjmować żądania, otwarte sesje są zamykane z bieżącym czasem,
+    a worklogi wysyłane do upływu SHUTDOWN_TIMEOUT; niewysłane trafiają do OUTBOX_FILE
+    i są wysyłane przy następnym starcie.
+    """
+    global shutting_down
+    if shutting_down:
+        return
+    shutting_down = True
+    deadline = time.monotonic() + SHUTDOWN_TIMEOUT
+    print(f"Zamykanie bota: {len(active_sessions)} otwartych sesji, limit {SHUTDOWN_TIMEOUT:g} s")
+
+    await run_blocking(webhook.stop_flask)
+    refresh_jira_user_directory.cancel()
+    flush_aggregated_worklogs.cancel()
+    evict_idle_tenants.cancel()
+
+    # Zamknij wszystkie otwarte sesje z czasem zamknięcia bota
+    snapshot = storage.snapshot
+    queue = []
+    for discord_id, session in list(active_sessions.items()):
+        entry = close_session(discord_id, session, snapshot)
+        if entry is not None:
+            queue.append((entry, session['task_info']['projekt']))
+    active_sessions.clear()
+    # Segmenty uczestników, którzy już wyszli z trwających spotkań
+    for entry, projekt, _ in meetings.take_all():
+        queue.append((entry, projekt))
+
+    async def worker():
+        # Nowe worklogi są pobierane z kolejki tylko przed upływem limitu czasu
+        while queue and time.monotonic() < deadline:
+            entry, projekt = queue.pop()
+            await submit_entry(entry, projekt)
+
+    workers = [asyncio.create_task(worker()) for _ in range(SHUTDOWN_WORKERS)]
+    await asyncio.wait(workers, timeout=max(0.0, deadline - time.monotonic()))
+
+    # Poczekaj na worklogi wysyłane jeszcze przez workery i webhook; te, których wysyłanie
+    # już trwa, mają dodatkowo SHUTDOWN_GRACE sekund
+    still_running = await run_blocking(outbox.wait_idle, max(0.0, deadline - time.monotonic()) + SHUTDOWN_GRACE)
+    if still_running:
+        # Zapisz je jako przerwane (przed ponownym wysłaniem JIRA jest sprawdzana pod kątem duplikatu)
+        print(f"Po upływie limitu czasu wciąż wysyłanych jest {len(still_running)} worklogów")
+        for entry in still_running:
+            outbox.defer(entry, interrupted=True)
+    # Przerwij workery, zanim zamknięte zostaną połączenia
+    for task in workers:
+        task.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+
+    for entry, projekt in queue:
+        outbox.defer(entry)
+    outbox.persist_deferred()
+
+    recorder.close()
+    await close_clients()
+    await bot.close()
+
+
+def request_shutdown():
+    task = asyncio.create_task(graceful_shutdown())
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
+# Event handlery bota Discord
+async def reconcile_voice_sessions():
+    """Uzgodnij sesje ze stanem kanałów głosowych (po starcie i po ponownym połączeniu)
+
+    Zamyka sesje użytkowników, których nie ma już na kanale sesji (zdarzenie wyjścia przepadło
+    podczas rozłączenia - inaczej ich spotkanie nigdy by się nie zakończyło), i tworzy sesje dla
+    użytkowników, którzy już są na śledzonych kanałach.
+    """
+    if shutting_down:
+        return
+    created = 0
+    closed = 0
+    snapshot = storage.snapshot
+    for guild in bot.guilds:
+        channels = [*guild.voice_channels, *guild.stage_channels]
+        present = {member.id: str(channel.id) for channel in channels for member in channel.members}
+        guild_id = str(guild.id)
+        stale = [discord_id for discord_id, session in active_sessions.items()
+                 if session['guild_id'] == guild_id and present.get(discord_id) != session['channel_id']]
+        for discord_id in stale:
+            # Czas wyjścia nie jest znany - sesja kończy się teraz
+            session = active_sessions.pop(discord_id, None)
+            if session is None:
+                # Wyjście obsłużone w międzyczasie przez on_voice_state_update
+                continue
+            channel = guild.get_channel(int(session['channel_id']))
+            await end_session(discord_id, guild.get_member(discord_id), session, channel, snapshot)
+            closed += 1
+
+        # Jedno przejście po kanałach głosowych gildii (wpisy w tasks.json i reguły), sesje tworzone hurtowo
+        new_sessions = {}
+        for channel in channels:
+            task_info = snapshot.task_for_channel(channel)
+            if task_info is None:
+                continue
+
+            for member in channel.members:
+                if member.bot or member.id in active_sessions:
+                    continue
+                new_sessions[member.id] = new_session(member, channel, task_info)
+                if MEETING_SUMMARY_CHANNEL:
+                    meetings.join(str(channel.id), member.id)
+
+        active_sessions.update(new_sessions)
+        created += len(new_sessions)
+
+        # Oddaj sterowanie pętli między gildiami, żeby nie blokować startu na dużych serwerach
+        await asyncio.sleep(0)
+
+    print(f"Uzgodniono stan kanałów głosowych: utworzono {created} sesji, zamknięto {closed}")
+
+
+@bot.event
+async def setup_hook():
+    # Zapisy stanu z wątków Flask i watchera będą wykonywane na tej pętli
+    loop = asyncio.get_running_loop()
+    storage.bind_event_loop(loop)
+
+    # SIGTERM (np. przy wdrożeniu) i Ctrl+C zamykają bota bez utraty otwartych sesji
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, request_shutdown)
+        except NotImplementedError:  # Windows
+            pass
+
+    # Sprawdź połączenie z JIRA; katalog użytkowników JIRA odświeżany w tle
+    await jira.check_connection()
+    refresh_jira_user_directory.start()
+    # Klienci gildii z własnymi danymi tworzeni są przy pierwszym użyciu
+    evict_idle_tenants.start()
+
+    # Tryb agregacji - sesje zebrane przed restartem i okresowe wysyłanie
+    if aggregation.ENABLED:
+        await run_blocking(aggregation.load_pending)
+        flush_aggregated_worklogs.start()
+
+    # Worklogi niewysłane przed poprzednim zamknięciem bota
+    unsent = await run_blocking(outbox.take_persisted)
+    if unsent:
+        task = asyncio.create_task(resend_unsent_worklogs(unsent))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+    # Zarejestruj komendy slash w Discord
+    synced = await bot.tree.sync()
+    print(f"Zsynchronizowano {len(synced)} komend slash")
+
+
+@bot.event
+async def on_ready():
+    print(f'{bot.user} połączony z Discord! Backend worklogów: {backends.backend.name}, '
+          f'agregacja: {aggregation.AGGREGATION_MODE}')
+    await reconcile_voice_sessions()
+
+    memory_mb = memory_usage_mb()
+    if memory_mb is not None:
+        print(f"Cache członków: {DISCORD_MEMBER_CACHE}, zużycie pamięci: {memory_mb:.1f} MB")
+
+
+@bot.event
+async def on_resumed():
+    print(f'{bot.user} wznowił połączenie z Discord')
+    await reconcile_voice_sessions()
+
+
+@bot.event
+async def on_voice_state_update(member, before, after):
+    recorder.record_voice(member, before, after)
+
+    # Ignoruj zmiany statusu bota i zdarzenia po rozpoczęciu zamykania (sesje są już zamknięte)
+    if member.bot or shutting_down:
+        return
+
+    print(f"Zmiana stanu głosowego: {member.name}")
+    print(f"Przed: {before.channel.name if before.channel else 'None'}")
+    print(f"Po: {after.channel.name if after.channel else 'None'}")
+
+    snapshot = storage.snapshot
+
+    # Dołączenie do kanału głosowego
+    if before.channel is None and after.channel is not None:
+        # Wpis kanału w tasks.json albo reguła (kategoria, nazwa, klucz zadania w nazwie)
+        task_info = snapshot.task_for_channel(after.channel)
+        if task_info is not None:
+            # Rozpocznij śledzenie czasu
+            active_sessions[member.id] = new_session(member, after.channel, task_info)
+            if MEETING_SUMMARY_CHANNEL:
+                meetings.join(str(after.channel.id), member.id)
+
+            # Powiadom użytkownika o rozpoczęciu śledzenia
+            await notify(
+                member,
+                f"Rozpoczęto śledzenie czasu na kanale {after.channel.name} "
+                f"dla zadania {task_info['zadanie']} w projekcie {task_info['projekt']}"
+            )
+            print(f"Użytkownik {member.name} rozpoczął śledzenie na kanale {after.channel.name}")
+
+    # Opuszczenie kanału głosowego
+    if before.channel is not None and (after.channel is None or before.channel.id != after.channel.id):
+        print(f"Użytkownik {member.name} opuścił kanał {before.channel.name}")
+
+        session = active_sessions.pop(member.id, None)
+        if session is None:
+            print(f"Nie znaleziono aktywnej sesji dla {member.name}")
+            return
+
+        print(f"Znaleziono aktywną sesję dla {member.name}")
+        await end_session(member.id, member, session, before.channel, snapshot)
+
+
+# Komendy do testowania połączeń
+@bot.command(name='test_tempo_connection')
+async def test_tempo_connection(ctx):
+    """Test połączenia z Tempo API"""
+    try:
+        # Próba pobrania informacji o worklogach (tylko sprawdzenie połączenia)
+        status, _, _ = await tenant_of(ctx.guild).tempo.request('GET', '/4/worklogs', params={"from": datetime.now().strftime("%Y-%m-%d")})
+        await ctx.send(f"Połączenie z Tempo API działa! Kod odpowiedzi: {status}")
+    except ApiError as e:
+        await ctx.send(f"Błąd połączenia z Tempo API. Kod: {e.status}, Treść: {e.text}")
+    except Exception as e:
+        await ctx.send(f"Wyjątek podczas testowania Tempo API: {str(e)}")
+
+
+@bot.command(name='test_jira')
+async def test_jira(ctx):
+    """Test połączenia z JIRA"""
+    client = tenant_of(ctx.guild).jira
+    if await client.ensure_connected():
+        try:
+            # Spróbuj pobrać bieżącego użytkownika jako test
+            myself = await client.myself()
+            await ctx.send(f"Połączenie z JIRA działa! Zalogowany jako: {myself['displayName']}")
+
+            # Spróbuj wyświetlić szczegóły projektu
+            await ctx.send("Próba wyświetlenia projektów...")
+
+            projects = await client.projects()
+            project_list = ", ".join([project['key'] for project in projects])
+            await ctx.send(f"Dostępne projekty: {project_list}")
+
+        except Exception as e:
+            await ctx.send(f"Błąd podczas testowania JIRA: {str(e)}")
+    else:
+        await ctx.send("Brak połączenia z JIRA.")
+
+
+# Komendy do zarządzania mapowaniami użytkowników
+@bot.command(name='get_account_id')
+async def get_account_id(ctx):
+    """Pobierz swoje Atlassian Account ID"""
+    try:
+        # Pobierz informacje o aktualnie zalogowanym użytkowniku
+        myself = await tenant_of(ctx.guild).jira.myself()
+        account_id = myself['accountId']
+
+        await ctx.send(f"Twoje Atlassian Account ID: `{account_id}`\n"
+                       f"To jest wartość, którą powinieneś używać w mapowaniu użytkowników.")
+    except Exception as e:
+        await ctx.send(f"Błąd podczas pobierania Account ID: {str(e)}")
+
+
+@bot.command(name='find_jira_account_id')
+async def find_jira_account_id(ctx, search_term: str):
+    """Znajdź Account ID użytkownika JIRA na podstawie nazwy, emaila lub innego identyfikatora"""
+    try:
+        users = await directory.search_jira_users(search_term, tenant_of(ctx.guild))
+
+        if not users:
+            await ctx.send(f"Nie znaleziono użytkowników pasujących do '{search_term}' w JIRA.")
+            return
+
+        await ctx.send(directory.format_jira_users(search_term, users))
+    except Exception as e:
+        await ctx.send(f"Błąd podczas wyszukiwania użytkowników: {str(e)}")
+
+
+@bot.command(name='map_user')
+async def map_user(ctx, discord_user: discord.Member, jira_account_id: str):
+    """Mapuj użytkownika Discord na Account ID użytkownika JIRA"""
+    error = await directory.check_jira_account_id(jira_account_id, tenant_of(ctx.guild))
+    if error:
+        await ctx.send(error)
+        return
+
+    # Zapisz mapowanie
+    try:
+        storage.set_user_mapping(str(discord_user.id), jira_account_id)
+    except Exception as e:
+        await ctx.send(f"Błąd zapisywania konfiguracji: {str(e)}")
+        return
+
+    await ctx.send(f"Pomyślnie zmapowano użytkownika Discord {discord_user.name} na Account ID JIRA: {jira_account_id}")
+
+
+@bot.command(name='reload_config')
+async def reload_config(ctx):
+    """Przeładuj konfigurację (mapowania użytkowników i kanałów) z plików"""
+    try:
+        await run_blocking(storage.reload_files)
+    except Exception as e:
+        await ctx.send(f"Nie przeładowano konfiguracji - błąd w pliku: {str(e)}")
+        return
+
+    await ctx.send("Konfiguracja została przeładowana.")
+
+
+@bot.command(name='flush_worklogs')
+async def flush_worklogs(ctx):
+    """Wyślij od razu wszystkie zagregowane worklogi"""
+    if not aggregation.ENABLED:
+        await ctx.send("Agregacja worklogów jest wyłączona (AGGREGATION_MODE=off).")
+        return
+
+    sent, failed = await aggregation.flush(force=True)
+    await ctx.send(f"Wysłano {sent} zagregowanych worklogów, nieudanych: {failed}.")
+
+
+@bot.command(name='show_mappings')
+async def show_mappings(ctx):
+    """Pokaż wszystkie mapowania użytkowników Discord do JIRA"""
+    user_mappings = storage.snapshot.user_mappings
+    if not user_mappings:
+        await ctx.send("Brak zapisanych mapowań użytkowników.")
+        return
+
+    message = "Mapowania użytkowników Discord do JIRA:\n"
+    for discord_id, jira_account_id in user_mappings.items():
+        # Spróbuj znaleźć użytkownika Discord
+        discord_name = await resolve_discord_name(discord_id)
+
+        message += f"- Discord: {discord_name} ({discord_id}), JIRA Account ID: {jira_account_id}\n"
+
+    await ctx.send(message)
+
+
+# Komendy do zarządzania zadaniami
+@bot.command(name='set_task')
+async def set_task(ctx, channel_id: str, projekt: str, zadanie: str):
+    """Przypisz zadanie JIRA do kanału głosowego"""
+    # Sprawdź czy kanał istnieje
+    try:
+        channel = bot.get_channel(int(channel_id))
+        if not channel:
+            await ctx.send(f"Nie znaleziono kanału o ID {channel_id}")
+            return
+
+        # Sprawdź czy zadanie istnieje w JIRA gildii
+        client = tenant_of(channel.guild).jira
+        if await client.ensure_connected():
+            try:
+                await client.issue(zadanie, fields='key')
+            except Exception:
+                await ctx.send(f"Nie znaleziono zadania {zadanie} w JIRA. Sprawdź poprawność kodu zadania.")
+                return
+
+        # Zapisz mapowanie
+        try:
+            storage.set_channel_task(channel_id, projekt, zadanie)
+        except Exception as e:
+            await ctx.send(f"Błąd zapisywania zadań: {str(e)}")
+            return
+
+        await ctx.send(
+            f"Ustawiono śledzenie czasu na kanale {channel.name} dla zadania {zadanie} w projekcie {projekt}")
+    except ValueError:
+        await ctx.send("Nieprawidłowe ID kanału. Upewnij się, że podałeś poprawny numer.")
+
+
+@bot.command(name='show_tasks')
+async def show_tasks(ctx):
+    """Pokaż wszystkie przypisane zadania"""
+    snapshot = storage.snapshot
+    if not snapshot.channel_tasks and not snapshot.channel_rules:
+        await ctx.send("Nie ma żadnych przypisanych zadań.")
+        return
+
+    message = "Twoje ustawione zadania:\n"
+    for channel_id, task_info in snapshot.channel_tasks.items():
+        channel = bot.get_channel(int(channel_id))
+        channel_name = channel.name if channel else f"Nieznany kanał ({channel_id})"
+        message += f"- Kanał: {channel_name}, Projekt: {task_info['projekt']}, Zadanie: {task_info['zadanie']}\n"
+
+    if snapshot.channel_rules:
+        message += "Reguły dla pozostałych kanałów (pierwsza pasująca):\n"
+        for rule in snapshot.channel_rules:
+            message += f"- {describe_rule(rule)}\n"
+
+    await ctx.send(message)
+
+
+@bot.command(name='remove_task')
+async def remove_task(ctx, channel_id: str):
+    """Usuń przypisanie zadania z kanału"""
+    if channel_id in storage.snapshot.channel_tasks:
+        channel = bot.get_channel(int(channel_id))
+        channel_name = channel.name if channel else f"Nieznany kanał ({channel_id})"
+
+        try:
+            storage.remove_channel_task(channel_id)
+        except Exception as e:
+            await ctx.send(f"Błąd zapisywania zadań: {str(e)}")
+            return
+
+        await ctx.send(f"Usunięto zadanie dla kanału {channel_name}")
+    else:
+        await ctx.send("Nie znaleziono przypisania zadania dla tego kanału.")
+
+
+@bot.command(name='import_mappings')
+async def import_mappings(ctx):
+    """Zaimportuj mapowania kanałów i użytkowników z załączonego pliku CSV lub JSON"""
+    if not ctx.message.attachments:
+        await ctx.send("Załącz plik CSV lub JSON z mapowaniami.")
+        return
+
+    attachment = ctx.message.attachments[0]
+    try:
+        content = (await attachment.read()).decode('utf-8-sig')
+        tasks, users, rules, errors = await mappings.prepare_import(content, attachment.filename, tenant_of(ctx.guild))
+    except Exception as e:
+        await ctx.send(f"Błąd podczas wczytywania pliku: {str(e)}")
+        return
+
+    if errors:
+        message = f"Import przerwany, znaleziono {len(errors)} błędów:\n"
+        message += "\n".join(f"- {error}" for error in errors[:20])
+        await ctx.send(message)
+        return
+
+    try:
+        mappings.apply_import(tasks, users, rules)
+    except Exception as e:
+        await ctx.send(f"Błąd podczas zapisywania mapowań: {str(e)}")
+        return
+
+    await ctx.send(mappings.import_summary(tasks, users, rules))
+
+
+@bot.command(name='export_mappings')
+async def export_mappings(ctx, format: str = 'csv'):
+    """Wyeksportuj mapowania kanałów i użytkowników jako plik CSV lub JSON"""
+    if format == 'json':
+        data = mappings.export_json().encode('utf-8')
+    else:
+        format = 'csv'
+        data = "".join(mappings.iter_export_csv()).encode('utf-8')
+
+    await ctx.send(file=discord.File(io.BytesIO(data), filename=f"mappings.{format}"))
+
+
+@bot.command(name='add_worklog')
+async def add_worklog(ctx, zadanie: str, czas: str, *, komentarz: str = "Ręcznie dodany czas"):
+    """Ręcznie dodaj worklog do JIRA (np. !add_worklog PROJ-123 30m Praca nad funkcją X)"""
+    client = tenant_of(ctx.guild).jira
+    if not await client.ensure_connected():
+        await ctx.send("Nie ma połączenia z JIRA.")
+        return
+
+    discord_id = str(ctx.author.id)
+    user_mappings = storage.snapshot.user_mappings
+
+    try:
+        # Sprawdź czy użytkownik ma mapowanie do JIRA
+        if discord_id in user_mappings:
+            jira_username = user_mappings[discord_id]
+
+            try:
+                # Próba dodania worklogu jako użytkownik
+                await client.add_worklog(zadanie, czas, komentarz, author_account_id=jira_username)
+
+                await ctx.send(
+                    f"Dodano worklog do zadania {zadanie} jako {jira_username}. Czas: {czas}, Komentarz: {komentarz}")
+                return
+            except Exception as e:
+                print(f"Błąd przy dodawaniu worklogu jako {jira_username}: {e}")
+                # Kontynuuj do standardowej metody
+
+        # Standardowa metoda jako admin
+        await client.add_worklog(zadanie, czas, komentarz)
+
+        await ctx.send(f"Dodano worklog do zadania {zadanie}. Czas: {czas}, Komentarz: {komentarz}")
+    except Exception as e:
+        await ctx.send(f"Błąd podczas dodawania worklogu: {str(e)}")
+
+
+# Komendy slash - odpowiedź jest odraczana (defer), a wynik z JIRA wysyłany jako kolejna wiadomość
+async def issue_key_autocomplete(interaction: discord.Interaction, current: str):
+    """Podpowiedzi kluczy zadań z lokalnego indeksu"""
+    return [app_commands.Choice(name=key, value=key) for key in match_choices(storage.snapshot.known_issue_keys, current)]
+
+
+async def jira_user_autocomplete(interaction: discord.Interaction, current: str):
+    """Podpowiedzi użytkowników JIRA gildii (po nazwie, emailu lub Account ID)"""
+    return [
+        app_commands.Choice(name=f"{user['displayName']} ({user['accountId']})"[:100], value=user['accountId'])
+        for user in await directory.autocomplete_jira_users(current, tenant_of(interaction.guild))
+    ]
+
+
+@bot.tree.command(name='test_jira', description="Test połączenia z JIRA")
+async def slash_test_jira(interaction: discord.Interaction):
+    await interaction.response.defer(thinking=True)
+    client = tenant_of(interaction.guild).jira
+    if not await client.ensure_connected():
+        await interaction.followup.send("Brak połączenia z JIRA.")
+        return
+
+    try:
+        myself = await client.myself()
+        projects = await client.projects()
+        project_list = ", ".join([project['key'] for project in projects])
+        await interaction.followup.send(
+            f"Połączenie z JIRA działa! Zalogowany jako: {myself['displayName']}\n"
+            f"Dostępne projekty: {project_list}"
+        )
+    except Exception as e:
+        await interaction.followup.send(f"Błąd podczas testowania JIRA: {str(e)}")
+
+
+@bot.tree.command(name='set_task', description="Przypisz zadanie JIRA do kanału głosowego")
+@app_commands.describe(kanal="Kanał głosowy", projekt="Klucz projektu JIRA", zadanie="Klucz zadania JIRA")
+@app_commands.autocomplete(zadanie=issue_key_autocomplete)
+async def slash_set_task(interaction: discord.Interaction, kanal: discord.VoiceChannel, projekt: str, zadanie: str):
+    await interaction.response.defer(thinking=True)
+
+    # Sprawdź czy zadanie istnieje w JIRA gildii
+    client = tenant_of(kanal.guild).jira
+    if await client.ensure_connected():
+        try:
+            await client.issue(zadanie, fields='key')
+        except Exception:
+            await interaction.followup.send(
+                f"Nie znaleziono zadania {zadanie} w JIRA. Sprawdź poprawność kodu zadania.")
+            return
+
+    # Zapisz mapowanie
+    try:
+        storage.set_channel_task(str(kanal.id), projekt, zadanie)
+    except Exception as e:
+        await interaction.followup.send(f"Błąd zapisywania zadań: {str(e)}")
+        return
+
+    await interaction.followup.send(
+        f"Ustawiono śledzenie czasu na kanale {kanal.name} dla zadania {zadanie} w projekcie {projekt}")
+
+
+@bot.tree.command(name='find_jira_account_id', description="Znajdź Account ID użytkownika JIRA")
+@app_commands.describe(search_term="Nazwa, email lub inny identyfikator")
+@app_commands.autocomplete(search_term=jira_user_autocomplete)
+async def slash_find_jira_account_id(interaction: discord.Interaction, search_term: str):
+    await interaction.response.defer(thinking=True)
+    try:
+        users = await directory.search_jira_users(search_term, tenant_of(interaction.guild))
+    except Exception as e:
+        await interaction.followup.send(f"Błąd podczas wyszukiwania użytkowników: {str(e)}")
+        return
+
+    if not users:
+        await interaction.followup.send(f"Nie znaleziono użytkowników pasujących do '{search_term}' w JIRA.")
+        return
+
+    await interaction.followup.send(directory.format_jira_users(search_term, users))
+
+
+@bot.tree.command(name='map_user', description="Mapuj użytkownika Discord na Account ID użytkownika JIRA")
+@app_commands.describe(discord_user="Użytkownik Discord", jira_account_id="Account ID użytkownika JIRA")
+@app_commands.autocomplete(jira_account_id=jira_user_autocomplete)
+async def slash_map_user(interaction: discord.Interaction, discord_user: discord.User, jira_account_id: str):
+    # Sprawdzenie w JIRA gildii może potrwać dłużej niż limit odpowiedzi na interakcję. Pierwsza
+    # odpowiedź zastępuje komunikat "myśli...", więc jego widoczność (tylko dla wywołującego) dotyczy
+    # wszystkich odpowiedzi - błędy nie trafiają na kanał
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    error = await directory.check_jira_account_id(jira_account_id, tenant_of(interaction.guild))
+    if error:
+        await interaction.followup.send(error)
+        return
+
+    try:
+        storage.set_user_mapping(str(discord_user.id), jira_account_id)
+    except Exception as e:
+        await interaction.followup.send(f"Błąd zapisywania konfiguracji: {str(e)}")
+        return
+
+    await interaction.followup.send(
+        f"Pomyślnie zmapowano użytkownika Discord {discord_user.name} na Account ID JIRA: {jira_account_id}")
@@ -0,0 +1,217 @@
+import asyncio
+import functools
+import json
+
+import aiohttp
+
+from . import storage
+from .settings import (
+    JIRA_ADMIN_EMAIL, JIRA_ADMIN_TOKEN, JIRA_MAX_CONNECTIONS, JIRA_RETRIES, JIRA_SERVER, JIRA_TIMEOUT,
+    TEMPO_API_BASE, TEMPO_API_TOKEN
+)
+
+# Odpowiedzi, po których warto ponowić żądanie, i maksymalne oczekiwanie z nagłówka Retry-After
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Żądania zmieniające dane (POST) są ponawiane tylko gdy serwer ich na pewno nie przyjął
+RETRY_STATUSES_UNSAFE = {429, 503}
+MAX_RETRY_AFTER = 30
+
+# Ile kluczy zadań sprawdzać jednym żądaniem (limit endpointu bulkfetch)
+BULK_FETCH_SIZE = 100
+
+
+class ApiError(Exception):
+    """Błąd odpowiedzi REST API"""
+
+    def __init__(self, status, text):
+        super().__init__(f"{status} - {text[:500]}")
+        self.status = status
+        self.text = text
+
+
+def retry_delay(attempt, retry_after=None):
+    """Zwróć czas oczekiwania przed ponowieniem (Retry-After albo wykładniczo rosnący)"""
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_RETRY_AFTER)
+        except ValueError:
+            pass
+    return min(0.5 * 2 ** attempt, MAX_RETRY_AFTER)
+
+
+class RestClient:
+    """Asynchroniczny klient REST: wspólna pula połączeń, limit czasu i ponawianie żądań"""
+
+    def __init__(self, base_url, headers=None, auth=None, max_connections=JIRA_MAX_CONNECTIONS):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'Accept': 'application/json', **(headers or {})}
+        self.auth = auth
+        # Limit połączeń puli - nadmiarowe żądania czekają w kolejce tego klienta
+        self.max_connections = max_connections
+        self.session = None
+        self.session_loop = None
+
+    def get_session(self):
+        """Zwróć sesję HTTP bieżącej pętli zdarzeń, tworząc ją przy pierwszym użyciu"""
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self.session_loop is not loop:
+            self.session = aiohttp.ClientSession(
+                headers=self.headers,
+                auth=self.auth,
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=JIRA_TIMEOUT)
+            )
+            self.session_loop = loop
+        return self.session
+
+    async def close(self):
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def request(self, method, path, params=None, json_data=None, headers=None, expected=(200,)):
+        """Wykonaj żądanie, ponawiając je po błędach przejściowych; zwraca (status, nagłówki, dane JSON)"""
+        url = f"{self.base_url}{path}"
+        retry_statuses = RETRY_STATUSES if method == 'GET' else RETRY_STATUSES_UNSAFE
+
+        for attempt in range(JIRA_RETRIES + 1):
+            try:
+                async with self.get_session().request(method, url, params=params, json=json_data,
+                                                      headers=headers) as response:
+                    text = await response.text()
+                    if response.status in expected:
+                        return response.status, response.headers, json.loads(text) if text else None
+                    if response.status not in retry_statuses or attempt == JIRA_RETRIES:
+                        raise ApiError(response.status, text)
+                    delay = retry_delay(attempt, response.headers.get('Retry-After'))
+            except aiohttp.ClientConnectorError:
+                # Połączenie nie zostało nawiązane - żądanie na pewno nie dotarło, można ponowić
+                if attempt == JIRA_RETRIES:
+                    raise
+                delay = retry_delay(attempt)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if method != 'GET' or attempt == JIRA_RETRIES:
+                    raise
+                delay = retry_delay(attempt)
+
+            print(f"Ponawianie {method} {path} za {delay:.1f} s (próba {attempt + 2} z {JIRA_RETRIES + 1})")
+            await asyncio.sleep(delay)
+
+    async def get(self, path, **params):
+        return (await self.request('GET', path, params=params))[2]
+
+
+class JiraClient(RestClient):
+    """Endpointy JIRA REST używane przez bota; zadania pobierane tylko z wybranymi polami"""
+
+    def __init__(self, server=JIRA_SERVER, email=JIRA_ADMIN_EMAIL, token=JIRA_ADMIN_TOKEN,
+                 max_connections=JIRA_MAX_CONNECTIONS):
+        super().__init__(server, auth=aiohttp.BasicAuth(email, token), max_connections=max_connections)
+        self.connected = False
+
+    async def check_connection(self):
+        """Sprawdź połączenie z JIRA (wynik w atrybucie connected)"""
+        try:
+            await self.myself()
+            self.connected = True
+            print("Połączono z JIRA (admin)")
+        except Exception as e:
+            self.connected = False
+            print(f"Błąd połączenia z JIRA (admin): {e}")
+        return self.connected
+
+    async def ensure_connected(self):
+        """Zwróć True, jeśli połączenie działa (przy braku połączenia sprawdź je ponownie)"""
+        return self.connected or await self.check_connection()
+
+    async def myself(self):
+        return await self.get('/rest/api/3/myself')
+
+    async def projects(self):
+        return await self.get('/rest/api/3/project')
+
+    async def issue(self, issue_key, fields='key'):
+        return await self.get(f'/rest/api/3/issue/{issue_key}', fields=fields)
+
+    async def find_issues(self, issue_keys, fields='key'):
+        """Pobierz zadania o podanych kluczach (po BULK_FETCH_SIZE naraz); nieistniejące są pomijane"""
+        issue_keys = list(issue_keys)
+        issues = []
+        for start in range(0, len(issue_keys), BULK_FETCH_SIZE):
+            _, _, data = await self.request('POST', '/rest/api/3/issue/bulkfetch', json_data={
+                'issueIdsOrKeys': issue_keys[start:start + BULK_FETCH_SIZE],
+                'fields': fields.split(',')
+            })
+            issues.extend(data.get('issues', []))
+        return issues
+
+    async def search_users(self, query, max_results=10):
+        return await self.get('/rest/api/3/user/search', query=query, maxResults=max_results)
+
+    async def user(self, account_id):
+        return await self.get('/rest/api/3/user', accountId=account_id)
+
+    async def users_page(self, start_at, max_results, etag=None):
+        """Pobierz stronę listy użytkowników; zwraca (status, nagłówki, dane) - 304 gdy ETag się zgadza"""
+        headers = {'If-None-Match': etag} if etag else None
+        return await self.request('GET', '/rest/api/3/users/search', headers=headers, expected=(200, 304),
+                                  params={'startAt': start_at, 'maxResults': max_results})
+
+    async def worklogs(self, issue_key):
+        """Pobierz worklogi zadania"""
+        return (await self.get(f'/rest/api/2/issue/{issue_key}/worklog')).get('worklogs', [])
+
+    async def add_worklog(self, issue_key, time_spent, comment, started=None, author_account_id=None):
+        """Dodaj worklog do zadania (opcjonalnie jako wskazany użytkownik)"""
+        worklog_data = {'timeSpent': time_spent, 'comment': comment}
+        if started is not None:
+            worklog_data['started'] = started.strftime("%Y-%m-%dT%H:%M:%S.000%z")
+        if author_account_id:
+            worklog_data['author'] = {'accountId': author_account_id}
+        _, _, data = await self.request('POST', f'/rest/api/2/issue/{issue_key}/worklog',
+                                        json_data=worklog_data, expected=(200, 201))
+        return data
+
+
+def create_tempo_client(base_url, token, max_connections=JIRA_MAX_CONNECTIONS):
+    return RestClient(base_url, headers={'Authorization': f"Bearer {token}"}, max_connections=max_connections)
+
+
+# Domyślni klienci (zmienne środowiskowe): JIRA (konto admina) i Tempo; gildie z własnymi
+# danymi dostępowymi mają osobnych klientów (moduł tenants)
+jira = JiraClient()
+tempo = create_tempo_client(TEMPO_API_BASE, TEMPO_API_TOKEN)
+
+
+async def close_clients():
+    """Zamknij pule połączeń klientów (domyślnych i gildii)"""
+    from .tenants import close_tenants
+
+    await jira.close()
+    await tempo.close()
+    await close_tenants()
+
+
+async def closing_clients(coro):
+    try:
+        return await coro
+    finally:
+        await close_clients()
+
+
+def run_sync(coro, timeout=120):
+    """Wykonaj korutynę z wątku spoza pętli zdarzeń (wątki Flask, linia komend)
+
+    Przy działającym bocie korutyna trafia na pętlę Discord (wspólna pula połączeń),
+    bez niego jest wykonywana w nowej pętli, po której klienci są zamykani.
+    """
+    loop = storage.event_loop
+    if loop is not None and loop.is_running():
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+    return asyncio.run(closing_clients(coro))
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Uruchom blokujące wywołanie (pliki, obliczenia) w puli wątków, poza pętlą zdarzeń"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
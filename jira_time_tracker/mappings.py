@@ -0,0 +1,252 @@
+import csv
+import io
+import json
+import re
+import sys
+
+from . import directory, storage, tenants
+from .jira_client import jira, run_blocking, run_sync
+from .routing import validate_rule
+
+# Import i eksport mapowań kanałów i użytkowników oraz reguł kanałów (wiersze "rule" w CSV)
+IMPORT_CSV_FIELDS = ['typ', 'id', 'projekt', 'zadanie', 'jira_account_id', 'category_id', 'name_pattern',
+                     'issue_key_in_name']
+ISSUE_KEY_PATTERN = re.compile(r'^[A-Z][A-Z0-9_]*-\d+$')
+
+
+def rule_from_row(row):
+    """Zamień wiersz CSV typu "rule" na regułę kanału w postaci z config.json"""
+    rule = {}
+    if row.get('category_id'):
+        rule['category_id'] = row['category_id']
+    if row.get('name_pattern'):
+        rule['name_pattern'] = row['name_pattern']
+    if (row.get('issue_key_in_name') or '').lower() == 'true':
+        rule['issue_key_in_name'] = True
+    if row.get('projekt') or row.get('zadanie'):
+        rule['projekt'] = row.get('projekt') or ''
+        rule['zadanie'] = row.get('zadanie') or ''
+    return rule
+
+
+def rule_to_row(rule):
+    """Zamień regułę kanału na wiersz CSV typu "rule" (odwrotność rule_from_row)"""
+    return {
+        'typ': 'rule',
+        'projekt': rule.get('projekt', ''),
+        'zadanie': rule.get('zadanie', ''),
+        'category_id': rule.get('category_id', ''),
+        'name_pattern': rule.get('name_pattern', ''),
+        'issue_key_in_name': 'true' if rule.get('issue_key_in_name') else '',
+    }
+
+
+def parse_mappings(content, filename):
+    """Wczytaj mapowania z CSV lub JSON; zwraca (channel_tasks, user_mappings, channel_rules)
+
+    channel_rules to None, gdy plik nie zawiera reguł - wtedy obecne reguły zostają bez zmian.
+    Przy nieprawidłowej strukturze pliku rzuca ValueError; poszczególne wpisy sprawdza prepare_import.
+    """
+    if filename.lower().endswith('.json'):
+        data = json.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError("oczekiwano obiektu z kluczami channel_tasks, user_mappings i channel_rules")
+        tasks = data.get('channel_tasks', {})
+        users = data.get('user_mappings', {})
+        rules = data.get('channel_rules')
+        if not isinstance(tasks, dict):
+            raise ValueError("sekcja channel_tasks powinna być obiektem kanał -> zadanie")
+        if not isinstance(users, dict):
+            raise ValueError("sekcja user_mappings powinna być obiektem użytkownik -> Account ID")
+        if rules is not None and not isinstance(rules, list):
+            raise ValueError("sekcja channel_rules powinna być listą")
+        return dict(tasks), dict(users), rules
+
+    reader = csv.DictReader(io.StringIO(content))
+    missing = [field for field in ('typ', 'id') if field not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"brak kolumn: {', '.join(missing)}")
+
+    tasks = {}
+    users = {}
+    rules = []
+    for line, row in enumerate(reader, 2):
+        if row['typ'] == 'task':
+            tasks[row['id']] = {'projekt': row.get('projekt'), 'zadanie': row.get('zadanie')}
+        elif row['typ'] == 'user':
+            users[row['id']] = row.get('jira_account_id')
+        elif row['typ'] == 'rule':
+            rules.append(rule_from_row(row))
+        else:
+            raise ValueError(f"wiersz {line}: nieznany typ wiersza: {row['typ']}")
+    return tasks, users, rules or None
+
+
+async def find_missing_issue_keys(keys, client=jira):
+    """Sprawdź wszystkie klucze zadań zbiorczo (bulkfetch po 100 kluczy, tylko pole key)"""
+    keys = sorted(set(keys))
+    if not keys or not await client.ensure_connected():
+        return []
+
+    found = {issue['key'] for issue in await client.find_issues(keys, fields='key')}
+    return [key for key in keys if key not in found]
+
+
+def resolve_jira_accounts(users):
+    """Zamień emaile na Account ID według katalogu użytkowników; zwraca (mapowania, błędy)"""
+    if not directory.jira_users:
+        # Katalog jeszcze nie wczytany - przyjmij wartości bez zmian
+        return dict(users), []
+
+    by_email = {user['email'].lower(): user['accountId'] for user in directory.jira_users.values() if user['email']}
+    resolved = {}
+    errors = []
+    for discord_id, value in users.items():
+        if value in directory.jira_users:
+            resolved[discord_id] = value
+        elif value.lower() in by_email:
+            resolved[discord_id] = by_email[value.lower()]
+        else:
+            errors.append(f"Nieznany użytkownik JIRA dla {discord_id}: {value}")
+    return resolved, errors
+
+
+async def prepare_import(content, filename, tenant=None):
+    """Wczytaj i zwaliduj plik importu w JIRA gildii (domyślnie - domyślnej)
+
+    Zwraca (zadania, użytkownicy, reguły kanałów albo None, błędy).
+    """
+    tenant = tenant or tenants.default_tenant
+    try:
+        tasks, users, rules = await run_blocking(parse_mappings, content, filename)
+    except (ValueError, csv.Error) as e:
+        return {}, {}, None, [f"Nieprawidłowy plik importu: {e}"]
+
+    # Te same warunki co przy wczytywaniu tasks.json i config.json - inaczej zapisany plik
+    # byłby potem odrzucany przy każdym przeładowaniu
+    errors = []
+    for channel_id, task_info in tasks.items():
+        if not channel_id or not channel_id.isdigit():
+            errors.append(f"Nieprawidłowe ID kanału: {channel_id}")
+        if not storage.is_valid_task(task_info):
+            errors.append(f"Nieprawidłowy wpis dla kanału {channel_id} (wymagane tekstowe pola projekt i zadanie)")
+        elif not ISSUE_KEY_PATTERN.match(task_info['zadanie']):
+            errors.append(f"Nieprawidłowy klucz zadania: {task_info['zadanie']}")
+    for discord_id, jira_account_id in users.items():
+        if not discord_id or not discord_id.isdigit():
+            errors.append(f"Nieprawidłowe ID użytkownika Discord: {discord_id}")
+        if not isinstance(jira_account_id, str) or not jira_account_id:
+            errors.append(f"Nieprawidłowy Account ID JIRA dla {discord_id}: {jira_account_id!r}")
+    rule_keys = []
+    for index, rule in enumerate(rules or [], 1):
+        try:
+            validate_rule(index, rule)
+        except ValueError as e:
+            errors.append(f"Nieprawidłowa reguła kanału: {e}")
+            continue
+        if not rule.get('issue_key_in_name'):
+            if not ISSUE_KEY_PATTERN.match(rule['zadanie']):
+                errors.append(f"Nieprawidłowy klucz zadania: {rule['zadanie']}")
+            rule_keys.append(rule['zadanie'])
+    if errors:
+        return tasks, users, rules, errors
+
+    issue_keys = [task_info['zadanie'] for task_info in tasks.values()] + rule_keys
+    for key in await find_missing_issue_keys(issue_keys, tenant.jira):
+        errors.append(f"Nie znaleziono zadania {key} w JIRA")
+
+    if tenant is tenants.default_tenant:
+        users, user_errors = resolve_jira_accounts(users)
+        errors.extend(user_errors)
+    else:
+        # Katalog (i zamiana emaili) dotyczy domyślnej JIRA - Account ID sprawdzane w JIRA gildii
+        for discord_id, jira_account_id in users.items():
+            error = await directory.check_jira_account_id(jira_account_id, tenant)
+            if error:
+                errors.append(f"Nieznany użytkownik JIRA dla {discord_id}: {jira_account_id}")
+    return tasks, users, rules, errors
+
+
+def apply_import(tasks, users, rules=None):
+    """Zapisz zaimportowane mapowania naraz: najpierw oba pliki, potem nowa migawka stanu
+
+    Reguły kanałów z pliku zastępują obecne (ich kolejność ma znaczenie); None - bez zmian.
+    """
+    storage.update_mappings(channel_tasks=tasks, user_mappings=users, channel_rules=rules)
+
+
+def import_summary(tasks, users, rules):
+    """Opisz wynik importu do wiadomości"""
+    summary = f"Zaimportowano {len(tasks)} mapowań kanałów i {len(users)} mapowań użytkowników"
+    if rules is not None:
+        summary += f" oraz {len(rules)} reguł kanałów"
+    return summary + "."
+
+
+def iter_export_csv():
+    """Generuj kolejne linie eksportu CSV (nagłówek, potem po jednym wierszu na mapowanie)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=IMPORT_CSV_FIELDS)
+
+    def flush():
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    snapshot = storage.snapshot
+    writer.writeheader()
+    yield flush()
+    for channel_id, task_info in snapshot.channel_tasks.items():
+        writer.writerow({'typ': 'task', 'id': channel_id, 'projekt': task_info['projekt'],
+                         'zadanie': task_info['zadanie']})
+        yield flush()
+    for discord_id, jira_account_id in snapshot.user_mappings.items():
+        writer.writerow({'typ': 'user', 'id': discord_id, 'jira_account_id': jira_account_id})
+        yield flush()
+    for rule in snapshot.channel_rules:
+        writer.writerow(rule_to_row(rule))
+        yield flush()
+
+
+def export_json():
+    """Zwróć eksport mapowań w formacie JSON"""
+    snapshot = storage.snapshot
+    return json.dumps({"channel_tasks": snapshot.tasks_dict(), "user_mappings": snapshot.mappings_dict(),
+                       "channel_rules": [dict(rule) for rule in snapshot.channel_rules]},
+                      ensure_ascii=False, indent=4)
+
+
+def cli_import(path):
+    """Import mapowań z linii komend"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        content = f.read()
+    return run_sync(import_content(content, path))
+
+
+async def import_content(content, path):
+    # Poza działającym botem katalog użytkowników nie jest wczytany - pobierz go raz
+    if await jira.check_connection() and not directory.jira_users:
+        try:
+            directory.rebuild_jira_user_directory(await directory.fetch_jira_users() or [])
+        except Exception as e:
+            print(f"Nie udało się pobrać katalogu użytkowników JIRA: {e}")
+
+    tasks, users, rules, errors = await prepare_import(content, path)
+    if errors:
+        for error in errors:
+            print(error)
+        return 1
+
+    apply_import(tasks, users, rules)
+    print(import_summary(tasks, users, rules))
+    return 0
+
+
+def cli_export(format):
+    """Eksport mapowań z linii komend (strumieniowo na stdout)"""
+    if format == 'json':
+        sys.stdout.write(export_json() + "\n")
+        return
+    for line in iter_export_csv():
+        sys.stdout.write(line)
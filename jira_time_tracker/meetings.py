@@ -0,0 +1,50 @@
+from dataclasses import dataclass, field
+
+# Spotkania na śledzonych kanałach (przy włączonym MEETING_SUMMARY_CHANNEL): segmenty uczestników,
+# którzy wyszli, czekają do opróżnienia kanału i są wysyłane razem, z jednym podsumowaniem.
+# Stan jest zmieniany tylko w pętli zdarzeń Discord.
+
+
+@dataclass
+class Meeting:
+    channel_id: str
+    participants: set = field(default_factory=set)
+    # Zakończone segmenty: (worklog, projekt, członek Discord)
+    segments: list = field(default_factory=list)
+
+
+meetings = {}  # channel_id -> Meeting
+
+
+def join(channel_id, member_id):
+    """Zapisz uczestnika spotkania na kanale"""
+    meeting = meetings.get(channel_id)
+    if meeting is None:
+        meeting = meetings[channel_id] = Meeting(channel_id)
+    meeting.participants.add(member_id)
+
+
+def leave(channel_id, member_id, segment=None):
+    """Zapisz wyjście uczestnika (z jego segmentem, jeśli nie był zbyt krótki)
+
+    Zwraca wszystkie segmenty spotkania, gdy wyszedł ostatni uczestnik, w przeciwnym razie None.
+    """
+    meeting = meetings.get(channel_id)
+    if meeting is None:
+        return [segment] if segment is not None else []
+
+    meeting.participants.discard(member_id)
+    if segment is not None:
+        meeting.segments.append(segment)
+    if meeting.participants:
+        return None
+
+    del meetings[channel_id]
+    return meeting.segments
+
+
+def take_all():
+    """Zwróć segmenty wszystkich trwających spotkań i wyczyść stan (przy zamykaniu bota)"""
+    segments = [segment for meeting in meetings.values() for segment in meeting.segments]
+    meetings.clear()
+    return segments
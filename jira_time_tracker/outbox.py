@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict
+from datetime import datetime
+
+from .settings import OUTBOX_FILE
+from .storage import write_json_atomic
+from .worklog import WorklogEntry
+
+# Worklogi w trakcie wysyłania (z pętli Discord i wątków Flask) - przy zamykaniu bot czeka,
+# aż ich wysyłanie się zakończy, a niewysłane zapisuje do OUTBOX_FILE na następny start
+in_flight = {}
+in_flight_changed = threading.Condition()
+
+# Worklogi odłożone przy zamykaniu bota (niewysłane w limicie czasu albo nieudane):
+# (worklog, przerwany) - przerwany worklog mógł już dotrzeć do JIRA i przed ponownym
+# wysłaniem trzeba to sprawdzić
+deferred = []
+
+
+@contextmanager
+def tracking(entry):
+    """Oznacz worklog jako wysyłany na czas trwania bloku"""
+    with in_flight_changed:
+        in_flight[id(entry)] = entry
+    try:
+        yield entry
+    finally:
+        with in_flight_changed:
+            in_flight.pop(id(entry), None)
+            in_flight_changed.notify_all()
+
+
+def wait_idle(timeout):
+    """Poczekaj (blokująco) aż wszystkie worklogi zostaną wysłane; zwraca niewysłane po upływie czasu"""
+    with in_flight_changed:
+        in_flight_changed.wait_for(lambda: not in_flight, timeout)
+        return list(in_flight.values())
+
+
+def to_record(entry, interrupted=False):
+    record = asdict(entry)
+    record['start_time'] = entry.start_time.isoformat()
+    record['end_time'] = entry.end_time.isoformat()
+    if interrupted:
+        record['interrupted'] = True
+    return record
+
+
+def from_record(record):
+    """Zwróć (worklog, przerwany) z zapisu w OUTBOX_FILE"""
+    record = dict(record)
+    interrupted = record.pop('interrupted', False)
+    record['start_time'] = datetime.fromisoformat(record['start_time'])
+    record['end_time'] = datetime.fromisoformat(record['end_time'])
+    return WorklogEntry(**record), interrupted
+
+
+def defer(entry, interrupted=False):
+    """Odłóż worklog do zapisania przy zamykaniu bota (przerwany - wysyłanie trwało przy zamknięciu)"""
+    with in_flight_changed:
+        for index, (pending, pending_interrupted) in enumerate(deferred):
+            if pending == entry:
+                # Ten sam worklog odłożony drugi raz (np. przerwany, a potem nieudany) - zapisz go raz
+                deferred[index] = (pending, pending_interrupted or interrupted)
+                return
+        deferred.append((entry, interrupted))
+
+
+def persist_deferred():
+    """Zapisz odłożone worklogi do wysłania przy następnym starcie"""
+    with in_flight_changed:
+        entries = list(deferred)
+        deferred.clear()
+    if not entries:
+        return
+    try:
+        write_json_atomic(OUTBOX_FILE, [to_record(entry, interrupted) for entry, interrupted in entries])
+        print(f"Zapisano {len(entries)} niewysłanych worklogów do {OUTBOX_FILE}")
+    except Exception as e:
+        print(f"Błąd zapisywania niewysłanych worklogów: {e}")
+
+
+def take_persisted():
+    """Wczytaj worklogi niewysłane przed restartem i usuń plik; zwraca listę (worklog, przerwany)"""
+    if not os.path.exists(OUTBOX_FILE):
+        return []
+    try:
+        with open(OUTBOX_FILE, 'r', encoding='utf-8') as f:
+            entries = [from_record(record) for record in json.load(f)]
+        os.remove(OUTBOX_FILE)
+    except Exception as e:
+        print(f"Błąd wczytywania niewysłanych worklogów: {e}")
+        return []
+    print(f"Wczytano {len(entries)} worklogów niewysłanych przed restartem")
+    return entries
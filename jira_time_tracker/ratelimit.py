@@ -0,0 +1,58 @@
+import math
+import threading
+
+from . import clock
+
+
+class TokenBucket:
+    """Kubełek tokenów: `rate` żądań na minutę, z możliwością chwilowego wykorzystania całego limitu"""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.refill_per_second = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = clock.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def try_acquire(self, now=None):
+        """Pobierz token; zwraca (czy_przyjęto, po_ilu_sekundach_ponowić)"""
+        now = clock.monotonic() if now is None else now
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0
+        return False, math.ceil((1 - self.tokens) / self.refill_per_second)
+
+
+class KeyedRateLimiter:
+    """Osobny kubełek tokenów dla każdego klucza (klient, użytkownik, kanał)"""
+
+    def __init__(self, rate_per_minute, max_keys=10000):
+        self.rate_per_minute = rate_per_minute
+        self.max_keys = max_keys
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def try_acquire(self, key):
+        """Pobierz token dla klucza; zwraca (czy_przyjęto, po_ilu_sekundach_ponowić)"""
+        if self.rate_per_minute <= 0:
+            return True, 0
+
+        now = clock.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.max_keys:
+                    self.evict_idle(now)
+                bucket = self.buckets[key] = TokenBucket(self.rate_per_minute)
+            return bucket.try_acquire(now)
+
+    def evict_idle(self, now):
+        """Usuń kubełki, które zdążyły się w pełni napełnić (klucze bez ruchu)"""
+        for key, bucket in list(self.buckets.items()):
+            bucket.refill(now)
+            if bucket.tokens >= bucket.capacity:
+                del self.buckets[key]
@@ -0,0 +1,78 @@
+import gzip
+import json
+import threading
+import time
+
+from . import clock
+from .settings import RECORD_FILE
+
+# Opcjonalne nagrywanie zdarzeń głosowych i wywołań webhooka do pliku JSONL (lub .jsonl.gz),
+# do późniejszego odtworzenia narzędziem replay. Każda linia to jedno zdarzenie z czasem "t"
+# w sekundach od początku nagrania.
+record_file = None
+record_lock = threading.Lock()
+record_started = None
+
+
+def open_record_file(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'at', encoding='utf-8')
+    return open(path, 'a', encoding='utf-8', buffering=1)
+
+
+def start(path=RECORD_FILE):
+    """Zacznij nagrywanie (gdy podano plik)"""
+    global record_file, record_started
+    if not path:
+        return
+
+    record_file = open_record_file(path)
+    record_started = time.monotonic()
+    write({'type': 'start', 'wall': clock.utc_now().isoformat()})
+    print(f"Nagrywanie zdarzeń do {path}")
+
+
+def write(event):
+    """Dopisz zdarzenie do nagrania (bezpieczne dla wielu wątków)"""
+    if record_file is None:
+        return
+    event['t'] = round(time.monotonic() - record_started, 3)
+    line = json.dumps(event, ensure_ascii=False, separators=(',', ':'))
+    with record_lock:
+        if record_file is not None:
+            record_file.write(line + "\n")
+
+
+def channel_info(voice_state):
+    channel = voice_state.channel
+    if channel is None:
+        return None
+    return [channel.id, channel.name, channel.guild.id if channel.guild else None, channel.category_id]
+
+
+def record_voice(member, before, after):
+    """Nagraj zmianę stanu głosowego"""
+    if record_file is None:
+        return
+    write({
+        'type': 'voice',
+        'member': [member.id, member.name, member.bot],
+        'before': channel_info(before),
+        'after': channel_info(after)
+    })
+
+
+def record_webhook(remote_addr, body):
+    """Nagraj wywołanie webhooka (treść bez nagłówków - sekret nie trafia do pliku)"""
+    if record_file is None:
+        return
+    write({'type': 'webhook', 'addr': remote_addr, 'body': body})
+
+
+def close():
+    """Zakończ nagrywanie i zamknij plik"""
+    global record_file
+    with record_lock:
+        if record_file is not None:
+            record_file.close()
+            record_file = None
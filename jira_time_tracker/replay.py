@@ -0,0 +1,165 @@
+import asyncio
+import contextvars
+import gzip
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from . import backends, clock, storage, timezones
+from .backends import StubBackend
+from .jira_client import close_clients
+from .settings import WEBHOOK_TOKEN
+
+
+# Czas z nagrania dla obsługiwanego zdarzenia - każde zdarzenie (zadanie asyncio, wątek webhooka)
+# ma własną kopię, więc równoległa obsługa nie przesuwa zegara innym zdarzeniom
+replay_time = contextvars.ContextVar('replay_time')
+
+
+class ReplayClock:
+    """Zegar wirtualny: czas z nagrania, niezależnie od prędkości odtwarzania"""
+
+    def utc_now(self):
+        return replay_time.get()[0]
+
+    def monotonic(self):
+        return replay_time.get()[1]
+
+
+class ReplayUser:
+    """Użytkownik Discord odtworzony z nagrania; wiadomości prywatne są tylko zliczane"""
+    sent_messages = 0
+
+    def __init__(self, user_id, name, bot):
+        self.id = user_id
+        self.name = name
+        self.bot = bot
+
+    async def send(self, message):
+        ReplayUser.sent_messages += 1
+
+
+class ReplayGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+
+
+class ReplayChannel:
+    def __init__(self, channel_id, name, guild_id=None, category_id=None):
+        self.id = channel_id
+        self.name = name
+        self.category_id = category_id
+        # Nagrania sprzed obsługi wielu gildii nie mają gildii kanału
+        self.guild = ReplayGuild(guild_id) if guild_id is not None else None
+
+
+class ReplayVoiceState:
+    def __init__(self, channel_info):
+        self.channel = ReplayChannel(*channel_info) if channel_info else None
+
+
+def read_events(path):
+    """Wczytaj nagranie; zwraca zdarzenia z pozycją na wspólnej osi czasu i czasem z nagrania
+
+    Plik może zawierać kilka nagrań (po restartach bota) - są sklejane jedno za drugim.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    events = []
+    segment_wall = None
+    segment_offset = 0.0
+    last_position = 0.0
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event['type'] == 'start':
+                segment_wall = datetime.fromisoformat(event['wall'])
+                segment_offset = last_position
+                continue
+            if segment_wall is None:
+                raise ValueError(f"{path}: brak nagłówka nagrania")
+            event['position'] = segment_offset + event['t']
+            event['wall'] = segment_wall + timedelta(seconds=event['t'])
+            last_position = event['position']
+            events.append(event)
+    return events
+
+
+def post_webhook(event):
+    """Wyślij nagrane wywołanie do webhooka (wątek spoza pętli, jak w serwerze Flask)"""
+    from .webhook import app
+
+    headers = {'Content-Type': 'application/json'}
+    if WEBHOOK_TOKEN:
+        headers['Authorization'] = f"Bearer {WEBHOOK_TOKEN}"
+    with app.test_client() as client:
+        response = client.post('/webhook/voice-activity', data=event['body'], headers=headers,
+                               environ_base={'REMOTE_ADDR': event['addr'] or '127.0.0.1'})
+    return response.status_code
+
+
+async def replay(path, speed=1.0, latency=0.0):
+    """Odtwórz nagranie przez on_voice_state_update i webhook, z backendem zaślepką
+
+    speed - mnożnik prędkości (0 - bez czekania między zdarzeniami). Czasy sesji liczone są
+    zegarem wirtualnym z nagrania, więc wynik nie zależy od prędkości odtwarzania. Odtwarzanie
+    nie łączy się z JIRA - strefy czasowe użytkowników spoza katalogu to strefa domyślna.
+    """
+    from . import discord_bot
+
+    events = read_events(path)
+    stub = StubBackend(latency)
+    backends.backend = stub
+    timezones.remote_lookup = False
+    clock.set_clock(ReplayClock())
+    loop = asyncio.get_running_loop()
+    storage.bind_event_loop(loop)
+
+    latencies = []
+    webhook_statuses = {}
+
+    async def handle(event):
+        started = time.perf_counter()
+        replay_time.set((event['wall'], event['position']))
+        if event['type'] == 'voice':
+            member = ReplayUser(*event['member'])
+            await discord_bot.on_voice_state_update(
+                member, ReplayVoiceState(event['before']), ReplayVoiceState(event['after']))
+        else:
+            # Wątek z kopią kontekstu - widzi czas zdarzenia, jak wątek serwera Flask widziałby zegar
+            status = await loop.run_in_executor(None, contextvars.copy_context().run, post_webhook, event)
+            webhook_statuses[status] = webhook_statuses.get(status, 0) + 1
+        latencies.append(time.perf_counter() - started)
+
+    print(f"Odtwarzanie {len(events)} zdarzeń z {path} (prędkość: {speed or 'maksymalna'})")
+    replay_started = time.monotonic()
+    handlers = []
+    try:
+        for event in events:
+            if speed:
+                delay = event['position'] / speed - (time.monotonic() - replay_started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            handlers.append(asyncio.create_task(handle(event)))
+        await asyncio.gather(*handlers)
+    finally:
+        await close_clients()
+    elapsed = time.monotonic() - replay_started
+
+    print(f"Zdarzenia: {len(events)} w {elapsed:.2f} s, worklogi: {len(stub.entries)}, "
+          f"wiadomości prywatne: {ReplayUser.sent_messages}, otwarte sesje: {len(discord_bot.active_sessions)}")
+    if webhook_statuses:
+        print(f"Odpowiedzi webhooka: {webhook_statuses}")
+    if latencies:
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"Czas obsługi zdarzenia: mediana {statistics.median(latencies) * 1000:.1f} ms, "
+              f"p95 {p95 * 1000:.1f} ms, maks. {latencies[-1] * 1000:.1f} ms")
+    return stub.entries
+
+
+def cli_replay(path, speed, latency):
+    """Odtwarzanie nagrania z linii komend"""
+    asyncio.run(replay(path, speed, latency))
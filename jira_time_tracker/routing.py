@@ -0,0 +1,112 @@
+import re
+from types import MappingProxyType
+
+# Reguły przypisywania zadań kanałom bez wpisu w tasks.json (np. kanały tworzone na żądanie).
+# Reguła (sekcja channel_rules w config.json) może mieć warunki:
+#   category_id       - kanał leży w tej kategorii
+#   name_pattern      - nazwa kanału pasuje do wyrażenia regularnego (bez rozróżniania wielkości liter)
+# oraz zadanie: stałe "projekt" i "zadanie" albo "issue_key_in_name": true - klucz zadania
+# (np. PROJ-123, wielkimi literami jak klucze JIRA) jest odczytywany z nazwy kanału, a projekt z jego prefiksu.
+# Wygrywa pierwsza pasująca reguła.
+
+# Bez rozróżniania wielkości liter zwykłe nazwy ("Room-1", "call-2") byłyby brane za klucze zadań
+ISSUE_KEY_PATTERN = re.compile(r'\b([A-Z][A-Z0-9_]+)-(\d+)\b')
+
+# Maksymalna liczba zapamiętanych kanałów - kanały tymczasowe mają za każdym razem nowe ID
+ROUTE_CACHE_SIZE = 10000
+
+
+def validate_rule(index, rule):
+    """Sprawdź regułę z config.json; przy błędzie rzuca ValueError"""
+    if not isinstance(rule, dict):
+        raise ValueError(f"reguła {index}: oczekiwano obiektu")
+    if 'category_id' not in rule and 'name_pattern' not in rule and not rule.get('issue_key_in_name'):
+        raise ValueError(f"reguła {index}: brak warunku (category_id, name_pattern lub issue_key_in_name)")
+    if not rule.get('issue_key_in_name') and not (isinstance(rule.get('projekt'), str)
+                                                  and isinstance(rule.get('zadanie'), str)):
+        raise ValueError(f"reguła {index}: brak projektu i zadania (albo issue_key_in_name)")
+    if 'name_pattern' in rule:
+        try:
+            re.compile(rule['name_pattern'])
+        except (re.error, TypeError) as e:
+            raise ValueError(f"reguła {index}: nieprawidłowy name_pattern: {e}")
+
+
+def describe_rule(rule):
+    """Opisz regułę do wyświetlenia w komendzie"""
+    conditions = []
+    if 'category_id' in rule:
+        conditions.append(f"kategoria {rule['category_id']}")
+    if 'name_pattern' in rule:
+        conditions.append(f"nazwa pasuje do `{rule['name_pattern']}`")
+    if rule.get('issue_key_in_name'):
+        target = "zadanie z nazwy kanału"
+    else:
+        target = f"Projekt: {rule['projekt']}, Zadanie: {rule['zadanie']}"
+    return f"{', '.join(conditions) or 'dowolny kanał'} -> {target}"
+
+
+class CompiledRule:
+    def __init__(self, rule):
+        self.category_id = str(rule['category_id']) if 'category_id' in rule else None
+        self.name_pattern = re.compile(rule['name_pattern'], re.IGNORECASE) if 'name_pattern' in rule else None
+        self.issue_key_in_name = bool(rule.get('issue_key_in_name'))
+        self.task_info = None
+        if not self.issue_key_in_name:
+            self.task_info = MappingProxyType({'projekt': rule['projekt'], 'zadanie': rule['zadanie']})
+
+    def match(self, name, category_id):
+        """Zwróć zadanie dla kanału albo None, jeśli reguła nie pasuje"""
+        if self.category_id is not None and self.category_id != category_id:
+            return None
+        if self.name_pattern is not None and not self.name_pattern.search(name or ''):
+            return None
+        if not self.issue_key_in_name:
+            return self.task_info
+
+        found = ISSUE_KEY_PATTERN.search(name or '')
+        if found is None:
+            return None
+        projekt = found.group(1)
+        return MappingProxyType({'projekt': projekt, 'zadanie': f"{projekt}-{found.group(2)}"})
+
+
+class ChannelRouter:
+    """Wyszukiwanie zadania kanału: najpierw dokładne ID, potem reguły (wynik zapamiętywany per kanał)
+
+    Router jest budowany razem z migawką, więc zmiana mapowań lub reguł zaczyna z pustą pamięcią.
+    """
+
+    def __init__(self, channel_tasks, rules):
+        self.channel_tasks = channel_tasks
+        self.rules = tuple(CompiledRule(rule) for rule in rules)
+        self.cache = {}
+
+    def resolve(self, channel_id, name=None, category_id=None):
+        """Zwróć zadanie kanału (projekt, zadanie) albo None, jeśli kanał nie jest śledzony"""
+        channel_id = str(channel_id)
+        task_info = self.channel_tasks.get(channel_id)
+        if task_info is not None or not self.rules:
+            return task_info
+
+        category_id = str(category_id) if category_id is not None else None
+        key = (channel_id, name, category_id)
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        task_info = None
+        for rule in self.rules:
+            task_info = rule.match(name, category_id)
+            if task_info is not None:
+                break
+
+        if len(self.cache) >= ROUTE_CACHE_SIZE:
+            self.cache.clear()
+        self.cache[key] = task_info
+        return task_info
+
+    def resolve_channel(self, channel):
+        """Zwróć zadanie dla kanału Discord"""
+        return self.resolve(channel.id, channel.name, channel.category_id)
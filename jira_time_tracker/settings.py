@@ -0,0 +1,82 @@
+import os
+
+# Konfiguracja bota Discord
+BOT_TOKEN = os.getenv('DISCORD_BOT_TOKEN', 'your_discord_bot_token')
+
+# Polityka cache członków: 'full' (domyślnie) lub 'voice' (tryb oszczędny)
+# W trybie 'voice' bot nie pobiera listy wszystkich członków gildii i trzyma w pamięci
+# tylko użytkowników obecnych na kanałach głosowych
+DISCORD_MEMBER_CACHE = os.getenv('DISCORD_MEMBER_CACHE', 'full')
+LEAN_MODE = DISCORD_MEMBER_CACHE == 'voice'
+
+# Konfiguracja JIRA i Tempo
+JIRA_SERVER = os.getenv('JIRA_SERVER', 'https://your_domain.atlassian.net')
+JIRA_ADMIN_EMAIL = os.getenv('JIRA_EMAIL', 'your_email@example.com')
+JIRA_ADMIN_TOKEN = os.getenv('JIRA_API_TOKEN', 'your_jira_api_token')
+# Klient REST (JIRA i Tempo): limit czasu żądania w sekundach, liczba ponowień i rozmiar puli połączeń
+JIRA_TIMEOUT = float(os.getenv('JIRA_TIMEOUT', '30'))
+JIRA_RETRIES = int(os.getenv('JIRA_RETRIES', '3'))
+JIRA_MAX_CONNECTIONS = int(os.getenv('JIRA_MAX_CONNECTIONS', '10'))
+
+# Dane dostępowe JIRA/Tempo dla poszczególnych gildii (pozostałe gildie używają danych powyżej)
+TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.json')
+# Po ilu minutach bez ruchu zamykać pule połączeń gildii i ile worklogów gildii wysyłać jednocześnie
+TENANT_IDLE_MINUTES = float(os.getenv('TENANT_IDLE_MINUTES', '30'))
+TENANT_MAX_CONCURRENCY = int(os.getenv('TENANT_MAX_CONCURRENCY', '4'))
+
+# Konfiguracja Tempo API
+TEMPO_API_TOKEN = os.getenv('TEMPO_API_TOKEN', 'your_tempo_api_token')
+# Wybierz odpowiedni region lub użyj domyślnego
+TEMPO_API_BASE = os.getenv('TEMPO_API_BASE', 'https://api.tempo.io')
+
+# Backend zapisujący worklogi: 'tempo', 'jira' lub 'file' (lokalny plik, do testów)
+WORKLOG_BACKEND = os.getenv('WORKLOG_BACKEND', 'tempo')
+WORKLOG_FILE = os.getenv('WORKLOG_FILE', 'worklogs.jsonl')
+
+# Agregacja worklogów: 'off', 'daily' lub 'weekly'; zebrane sesje są wysyłane o AGGREGATION_FLUSH_TIME
+AGGREGATION_MODE = os.getenv('AGGREGATION_MODE', 'off')
+AGGREGATION_FLUSH_TIME = os.getenv('AGGREGATION_FLUSH_TIME', '17:00')
+AGGREGATION_FILE = os.getenv('AGGREGATION_FILE', 'pending_worklogs.json')
+
+# Podsumowania spotkań: ID kanału tekstowego - gdy ustawione, worklogi uczestników są wysyłane razem
+# po opróżnieniu kanału głosowego (najwyżej MEETING_SUBMIT_CONCURRENCY naraz), z jednym podsumowaniem
+# zamiast wiadomości prywatnych; puste - każdy worklog od razu, z wiadomością do użytkownika
+MEETING_SUMMARY_CHANNEL = os.getenv('MEETING_SUMMARY_CHANNEL', '')
+MEETING_SUBMIT_CONCURRENCY = int(os.getenv('MEETING_SUBMIT_CONCURRENCY', '8'))
+
+# Zamykanie bota (SIGTERM): ile sekund czekać na wysłanie worklogów i gdzie zapisać niewysłane
+SHUTDOWN_TIMEOUT = float(os.getenv('SHUTDOWN_TIMEOUT', '20'))
+# Dodatkowy czas na dokończenie worklogów, których wysyłanie już trwa po upływie SHUTDOWN_TIMEOUT
+SHUTDOWN_GRACE = float(os.getenv('SHUTDOWN_GRACE', '5'))
+OUTBOX_FILE = os.getenv('OUTBOX_FILE', 'unsent_worklogs.json')
+
+# Strefa czasowa (np. Europe/Warsaw) dla użytkowników bez mapowania lub bez strefy w JIRA;
+# pusta wartość oznacza strefę serwera
+DEFAULT_TIME_ZONE = os.getenv('DEFAULT_TIME_ZONE', '')
+
+# Co ile minut odświeżać lokalny katalog użytkowników JIRA
+JIRA_USER_REFRESH_MINUTES = int(os.getenv('JIRA_USER_REFRESH_MINUTES', '60'))
+
+# Serwer webhooków
+WEBHOOK_HOST = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+WEBHOOK_PORT = int(os.getenv('WEBHOOK_PORT', '5000'))
+# Opcjonalny wspólny sekret - gdy ustawiony, żądania muszą mieć nagłówek "Authorization: Bearer <token>"
+WEBHOOK_TOKEN = os.getenv('WEBHOOK_TOKEN', '')
+# Limity żądań na minutę (0 wyłącza limit) dla adresu klienta, użytkownika i kanału
+WEBHOOK_CLIENT_RATE = int(os.getenv('WEBHOOK_CLIENT_RATE', '60'))
+WEBHOOK_USER_RATE = int(os.getenv('WEBHOOK_USER_RATE', '10'))
+WEBHOOK_CHANNEL_RATE = int(os.getenv('WEBHOOK_CHANNEL_RATE', '30'))
+# Maksymalny rozmiar treści żądania i liczba jednocześnie zapisywanych worklogów
+WEBHOOK_MAX_BODY_BYTES = int(os.getenv('WEBHOOK_MAX_BODY_BYTES', '4096'))
+WEBHOOK_MAX_PENDING = int(os.getenv('WEBHOOK_MAX_PENDING', '8'))
+
+# Nagrywanie zdarzeń głosowych i wywołań webhooka do pliku JSONL (.jsonl.gz - skompresowany);
+# puste - nagrywanie wyłączone. Nagranie odtwarza `python -m jira_time_tracker replay <plik>`
+RECORD_FILE = os.getenv('RECORD_FILE', '')
+
+# Nazwa plików konfiguracyjnych
+TASKS_FILE = "tasks.json"
+CONFIG_FILE = "config.json"
+
+# Co ile sekund sprawdzać zmiany plików konfiguracyjnych (gdy watchdog/inotify jest niedostępny)
+CONFIG_POLL_SECONDS = float(os.getenv('CONFIG_POLL_SECONDS', '2'))
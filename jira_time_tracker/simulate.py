@@ -0,0 +1,74 @@
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from .backends import StubBackend
+from .worklog import MIN_WORKLOG_MINUTES, build_entry, worklog_minutes
+
+# Symulacja budowania worklogów bez JIRA i Discord: losowe sesje przechodzą przez tę samą ścieżkę
+# co sesje głosowe (build_entry, format czasu JIRA) do backendu w pamięci, który parsuje czas
+# jak JIRA. Sprawdzane są zaokrąglenia, zgodność sum i mierzona jest przepustowość.
+
+# Najkrótsza śledzona sesja (próg 0.1 min) i najdłuższa generowana sesja, w sekundach
+MIN_SESSION_SECONDS = 6
+MAX_SESSION_SECONDS = 10 * 3600
+
+# Przesunięcia wokół pełnej i pół minuty - tam błędy zaokrągleń są najczęstsze
+BOUNDARY_OFFSETS = (-30.0, -0.4, 0.0, 0.4, 29.4, 29.5, 29.6, 30.0, 59.9)
+
+
+def synthetic_sessions(count, seed=0, issues=50, users=200):
+    """Generuj losowe sesje: (zadanie, użytkownik, początek, długość w sekundach)"""
+    rng = random.Random(seed)
+    first_day = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for _ in range(count):
+        if rng.random() < 0.25:
+            seconds = rng.randrange(1, MAX_SESSION_SECONDS // 60) * 60 + rng.choice(BOUNDARY_OFFSETS)
+        else:
+            seconds = rng.uniform(MIN_SESSION_SECONDS, MAX_SESSION_SECONDS)
+        yield (f"SIM-{rng.randrange(issues)}", f"user{rng.randrange(users)}",
+               first_day + timedelta(seconds=rng.randrange(365 * 86400)), max(MIN_SESSION_SECONDS, seconds))
+
+
+def simulate(count, seed=0):
+    """Przepuść count losowych sesji przez budowanie worklogów; zwraca listę znalezionych błędów"""
+    backend = StubBackend(keep_entries=False)
+    expected_totals = {}
+    errors = []
+    exact_seconds = 0
+    rounding_error = 0.0
+
+    started = time.perf_counter()
+    for issue_key, user, start_time, seconds in synthetic_sessions(count, seed):
+        entry = build_entry(issue_key, start_time, seconds, user, user, 'symulacja')
+        logged = backend.record(entry)
+
+        # Czas JIRA wynika z zapisanych pełnych sekund (tych samych, które dostaje Tempo)
+        expected = worklog_minutes(entry.duration_seconds / 60)
+        if logged != expected:
+            errors.append(f"{seconds:.3f} s: zapisano {entry.time_spent} ({logged} min), oczekiwano {expected} min")
+        elif abs(logged * 60 - seconds) > 30.5 and logged != MIN_WORKLOG_MINUTES:
+            errors.append(f"{seconds:.3f} s: {entry.time_spent} różni się o więcej niż pół minuty")
+
+        key = (issue_key, user)
+        expected_totals[key] = expected_totals.get(key, 0) + expected
+        exact_seconds += seconds
+        rounding_error += logged * 60 - seconds
+    elapsed = time.perf_counter() - started
+
+    if backend.totals != expected_totals:
+        errors.append("sumy zapisane w backendzie nie zgadzają się z sumami sesji")
+    logged_minutes = sum(backend.totals.values())
+
+    print(f"Sesje: {count} w {elapsed:.2f} s ({count / elapsed:,.0f} sesji/s), błędy: {len(errors)}")
+    print(f"Łącznie: {logged_minutes} min zapisanych, {exact_seconds / 60:.1f} min rzeczywistych, "
+          f"średni błąd zaokrąglenia {rounding_error / max(count, 1):+.3f} s na sesję")
+    for error in errors[:20]:
+        print(f"- {error}")
+    return errors
+
+
+def cli_simulate(sessions, seed):
+    """Symulacja z linii komend; kod wyjścia 1, gdy znaleziono błędy"""
+    sys.exit(1 if simulate(sessions, seed) else 0)
@@ -0,0 +1,267 @@
+import asyncio
+import json
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from .routing import ChannelRouter, validate_rule
+from .settings import CONFIG_FILE, TASKS_FILE
+
+
+def write_json_atomic(path, data):
+    """Zapisz JSON do pliku tymczasowego i podmień plik docelowy jedną operacją"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+    os.replace(tmp_path, path)
+
+
+def skip_or_raise(skip_invalid, message):
+    """Przy starcie pomiń błędny wpis (z komunikatem), w pozostałych przypadkach rzuć ValueError"""
+    if not skip_invalid:
+        raise ValueError(message)
+    print(f"Pominięto: {message}")
+
+
+def is_valid_task(task_info):
+    """Sprawdź wpis kanału z tasks.json: obiekt z tekstowymi polami projekt i zadanie"""
+    return (isinstance(task_info, dict) and isinstance(task_info.get('projekt'), str)
+            and isinstance(task_info.get('zadanie'), str))
+
+
+def read_tasks_file(skip_invalid=False):
+    """Wczytaj i zwaliduj tasks.json; przy błędzie rzuca wyjątek
+
+    Z skip_invalid błędne wpisy kanałów są pomijane, a wyjątek rzuca tylko plik nie do odczytania.
+    """
+    if not os.path.exists(TASKS_FILE):
+        return {}
+    with open(TASKS_FILE, 'r', encoding='utf-8') as f:
+        tasks = json.load(f)
+
+    if not isinstance(tasks, dict):
+        raise ValueError(f"{TASKS_FILE}: oczekiwano obiektu kanał -> zadanie")
+    for channel_id, task_info in list(tasks.items()):
+        if not is_valid_task(task_info):
+            skip_or_raise(skip_invalid, f"{TASKS_FILE}: nieprawidłowy wpis dla kanału {channel_id}")
+            del tasks[channel_id]
+    return tasks
+
+
+def read_config_file(skip_invalid=False):
+    """Wczytaj i zwaliduj config.json; przy błędzie rzuca wyjątek
+
+    Z skip_invalid błędne mapowania użytkowników i reguły są pomijane, a wyjątek rzuca tylko plik
+    nie do odczytania albo sekcja o nieprawidłowym typie.
+    """
+    if not os.path.exists(CONFIG_FILE):
+        return {"user_mappings": {}}
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    user_mappings = config.get("user_mappings", {}) if isinstance(config, dict) else None
+    if not isinstance(user_mappings, dict):
+        raise ValueError(f"{CONFIG_FILE}: nieprawidłowa sekcja user_mappings")
+    for discord_id, jira_account_id in list(user_mappings.items()):
+        if not isinstance(jira_account_id, str):
+            skip_or_raise(skip_invalid, f"{CONFIG_FILE}: nieprawidłowe mapowanie użytkownika {discord_id}")
+            del user_mappings[discord_id]
+
+    channel_rules = config.get("channel_rules", [])
+    if not isinstance(channel_rules, list):
+        raise ValueError(f"{CONFIG_FILE}: sekcja channel_rules powinna być listą")
+    valid_rules = []
+    for index, rule in enumerate(channel_rules, 1):
+        try:
+            validate_rule(index, rule)
+            valid_rules.append(rule)
+        except ValueError as e:
+            skip_or_raise(skip_invalid, f"{CONFIG_FILE}: {e}")
+    if "channel_rules" in config:
+        config["channel_rules"] = valid_rules
+    return config
+
+
+def load_config():
+    """Wczytaj konfigurację z pliku przy starcie (błędne wpisy są pomijane)
+
+    Pliku nie do odczytania nie można zastąpić pustą konfiguracją - pierwszy zapis (np. !map_user)
+    skasowałby wszystkie mapowania - więc start jest przerywany.
+    """
+    try:
+        return read_config_file(skip_invalid=True)
+    except Exception as e:
+        raise RuntimeError(f"Błąd wczytywania konfiguracji: {e}. Popraw {CONFIG_FILE} i uruchom bota ponownie.")
+
+
+def load_tasks():
+    """Wczytaj mapowanie kanałów i zadań przy starcie (błędne wpisy są pomijane)
+
+    Jak w load_config: plik nie do odczytania przerywa start, zamiast zostać nadpisany przy pierwszym zapisie.
+    """
+    try:
+        return read_tasks_file(skip_invalid=True)
+    except Exception as e:
+        raise RuntimeError(f"Błąd wczytywania zadań: {e}. Popraw {TASKS_FILE} i uruchom bota ponownie.")
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Niezmienny stan mapowań - czytelnicy (pętla Discord, wątki Flask) używają go bez blokad"""
+    channel_tasks: Mapping
+    user_mappings: Mapping
+    # Lokalny indeks kluczy zadań dla podpowiedzi w komendach slash (bez zapytań do JIRA przy każdym znaku)
+    known_issue_keys: frozenset
+    # Reguły kanałów z config.json (w postaci z pliku) i skompilowany router kanał -> zadanie
+    channel_rules: tuple
+    router: ChannelRouter
+
+    def tasks_dict(self):
+        """Zwróć mapowanie kanałów jako zwykły słownik (do zapisu w JSON)"""
+        return {channel_id: dict(task_info) for channel_id, task_info in self.channel_tasks.items()}
+
+    def mappings_dict(self):
+        """Zwróć mapowanie użytkowników jako zwykły słownik (do zapisu w JSON)"""
+        return dict(self.user_mappings)
+
+    def config_dict(self):
+        """Zwróć zawartość config.json (mapowania użytkowników i reguły kanałów)"""
+        config = {"user_mappings": self.mappings_dict()}
+        if self.channel_rules:
+            config["channel_rules"] = [dict(rule) for rule in self.channel_rules]
+        return config
+
+    def task_for_channel(self, channel):
+        """Zwróć zadanie przypisane kanałowi Discord (wpis w tasks.json albo reguła) lub None"""
+        return self.router.resolve_channel(channel)
+
+
+def build_snapshot(channel_tasks, user_mappings, channel_rules=()):
+    """Zbuduj niezmienną migawkę z podanych słowników; reguły kanałów są kompilowane raz, tutaj"""
+    channel_tasks = MappingProxyType({
+        str(channel_id): MappingProxyType(dict(task_info)) for channel_id, task_info in channel_tasks.items()
+    })
+    channel_rules = tuple(MappingProxyType(dict(rule)) for rule in channel_rules)
+    return Snapshot(
+        channel_tasks=channel_tasks,
+        user_mappings=MappingProxyType(dict(user_mappings)),
+        known_issue_keys=frozenset(
+            [task_info['zadanie'] for task_info in channel_tasks.values()]
+            + [rule['zadanie'] for rule in channel_rules if 'zadanie' in rule]
+        ),
+        channel_rules=channel_rules,
+        router=ChannelRouter(channel_tasks, channel_rules)
+    )
+
+
+def load_snapshot():
+    """Zbuduj migawkę z plików tasks.json i config.json"""
+    config = load_config()
+    return build_snapshot(load_tasks(), config.get("user_mappings", {}), config.get("channel_rules", []))
+
+
+# Aktualna migawka - podmieniana jednym przypisaniem (copy-on-write), nigdy modyfikowana w miejscu.
+# Czytelnik pobiera ją raz (snap = storage.snapshot) i ma spójny widok na cały czas obsługi zdarzenia.
+snapshot = load_snapshot()
+
+# Zapisy (komendy, import, przeładowanie plików) są serializowane
+_write_lock = threading.Lock()
+
+# Pętla zdarzeń Discord - zapisy zlecone z innych wątków (watcher, Flask) są wykonywane na niej
+event_loop = None
+
+
+def bind_event_loop(loop):
+    """Ustaw pętlę zdarzeń, na którą przekazywane są zapisy stanu"""
+    global event_loop
+    event_loop = loop
+
+
+def run_on_loop(func, *args, timeout=10, **kwargs):
+    """Wykonaj zapis w pętli zdarzeń Discord; z innego wątku czeka na wynik (run_coroutine_threadsafe)"""
+    loop = event_loop
+    if loop is None or not loop.is_running():
+        # Bez działającego bota (np. import z linii komend) - wykonaj bezpośrednio
+        return func(*args, **kwargs)
+
+    try:
+        if asyncio.get_running_loop() is loop:
+            return func(*args, **kwargs)
+    except RuntimeError:
+        pass
+
+    async def apply():
+        return func(*args, **kwargs)
+
+    return asyncio.run_coroutine_threadsafe(apply(), loop).result(timeout)
+
+
+def publish(channel_tasks=None, user_mappings=None, channel_rules=None):
+    """Opublikuj nową migawkę, zastępując podane części stanu"""
+    global snapshot
+    current = snapshot
+    snapshot = build_snapshot(
+        current.channel_tasks if channel_tasks is None else channel_tasks,
+        current.user_mappings if user_mappings is None else user_mappings,
+        current.channel_rules if channel_rules is None else channel_rules
+    )
+    return snapshot
+
+
+def update_mappings(channel_tasks=None, user_mappings=None, removed_channels=(), channel_rules=None):
+    """Dopisz/usuń mapowania (reguły kanałów - zastąp): zapisz pliki, a potem opublikuj nową migawkę"""
+    return run_on_loop(_update_mappings, channel_tasks, user_mappings, removed_channels, channel_rules)
+
+
+def _update_mappings(channel_tasks, user_mappings, removed_channels, channel_rules=None):
+    with _write_lock:
+        current = snapshot
+        tasks = current.tasks_dict()
+        users = current.mappings_dict()
+        for channel_id in removed_channels:
+            tasks.pop(channel_id, None)
+
+        if channel_tasks or removed_channels:
+            tasks.update(channel_tasks or {})
+            write_json_atomic(TASKS_FILE, tasks)
+        if user_mappings or channel_rules is not None:
+            users.update(user_mappings or {})
+            config = {**current.config_dict(), "user_mappings": users}
+            if channel_rules is not None:
+                config["channel_rules"] = [dict(rule) for rule in channel_rules]
+            write_json_atomic(CONFIG_FILE, config)
+
+        return publish(tasks, users, channel_rules)
+
+
+def set_channel_task(channel_id, projekt, zadanie):
+    """Przypisz zadanie do kanału"""
+    return update_mappings(channel_tasks={channel_id: {'projekt': projekt, 'zadanie': zadanie}})
+
+
+def remove_channel_task(channel_id):
+    """Usuń przypisanie zadania z kanału"""
+    return update_mappings(removed_channels=[channel_id])
+
+
+def set_user_mapping(discord_id, jira_account_id):
+    """Mapuj użytkownika Discord na konto JIRA"""
+    return update_mappings(user_mappings={discord_id: jira_account_id})
+
+
+def _publish_locked(channel_tasks, user_mappings, channel_rules):
+    with _write_lock:
+        return publish(channel_tasks, user_mappings, channel_rules)
+
+
+def reload_files():
+    """Wczytaj oba pliki od nowa (w bieżącym wątku) i opublikuj migawkę w pętli zdarzeń
+
+    Przy błędzie w pliku rzuca wyjątek, a obowiązuje poprzedni stan.
+    """
+    channel_tasks = read_tasks_file()
+    config = read_config_file()
+    return run_on_loop(_publish_locked, channel_tasks, config.get("user_mappings", {}),
+                       config.get("channel_rules", []))
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass
+
+from . import jira_client
+from .jira_client import JiraClient, create_tempo_client
+from .settings import (
+    JIRA_MAX_CONNECTIONS, TEMPO_API_BASE, TENANT_IDLE_MINUTES, TENANT_MAX_CONCURRENCY, TENANTS_FILE
+)
+
+# Gildie Discord z własnymi danymi dostępowymi JIRA/Tempo (najemcy). Każda ma osobną pulę połączeń
+# i osobny limit jednocześnie wysyłanych worklogów, więc ruch dużej gildii nie zużywa limitów
+# zapytań ani połączeń pozostałych. Gildie bez wpisu używają domyślnych klientów ze zmiennych środowiskowych.
+
+DEFAULT_TENANT = 'default'
+
+REQUIRED_FIELDS = ('jira_server', 'jira_email', 'jira_api_token')
+
+
+@dataclass(frozen=True)
+class TenantConfig:
+    """Dane dostępowe gildii z pliku TENANTS_FILE"""
+    name: str
+    jira_server: str
+    jira_email: str
+    jira_api_token: str
+    tempo_api_token: str = ''
+    tempo_api_base: str = TEMPO_API_BASE
+    max_connections: int = JIRA_MAX_CONNECTIONS
+    max_concurrency: int = TENANT_MAX_CONCURRENCY
+
+
+class Tenant:
+    """Klienci JIRA/Tempo gildii i kolejka jej worklogów"""
+
+    def __init__(self, name, jira, tempo, max_concurrency=TENANT_MAX_CONCURRENCY):
+        self.name = name
+        self.jira = jira
+        self.tempo = tempo
+        # Worklogi ponad limit czekają w kolejce (FIFO) tej gildii, nie blokując innych
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.last_used = time.monotonic()
+
+    def touch(self):
+        self.last_used = time.monotonic()
+
+    def is_idle(self, now, idle_seconds):
+        return self.active == 0 and now - self.last_used >= idle_seconds
+
+    async def run(self, coro):
+        """Wykonaj korutynę w ramach limitu gildii"""
+        self.active += 1
+        self.touch()
+        try:
+            async with self.slots:
+                return await coro
+        finally:
+            self.active -= 1
+            self.touch()
+
+    async def close(self):
+        await self.jira.close()
+        await self.tempo.close()
+
+
+def read_tenants_file():
+    """Wczytaj i zwaliduj plik z danymi gildii; przy błędzie rzuca wyjątek"""
+    if not os.path.exists(TENANTS_FILE):
+        return {}
+    with open(TENANTS_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError(f"{TENANTS_FILE}: oczekiwano obiektu gildia -> dane dostępowe")
+    configs = {}
+    for guild_id, entry in data.items():
+        if not isinstance(entry, dict) or not all(isinstance(entry.get(field), str) for field in REQUIRED_FIELDS):
+            raise ValueError(f"{TENANTS_FILE}: nieprawidłowy wpis dla gildii {guild_id} "
+                             f"(wymagane: {', '.join(REQUIRED_FIELDS)})")
+        configs[str(guild_id)] = TenantConfig(
+            name=entry.get('name') or str(guild_id),
+            jira_server=entry['jira_server'],
+            jira_email=entry['jira_email'],
+            jira_api_token=entry['jira_api_token'],
+            tempo_api_token=entry.get('tempo_api_token', ''),
+            tempo_api_base=entry.get('tempo_api_base', TEMPO_API_BASE),
+            max_connections=int(entry.get('max_connections', JIRA_MAX_CONNECTIONS)),
+            max_concurrency=int(entry.get('max_concurrency', TENANT_MAX_CONCURRENCY))
+        )
+    return configs
+
+
+def load_tenants():
+    """Wczytaj dane gildii z pliku"""
+    try:
+        configs = read_tenants_file()
+    except Exception as e:
+        print(f"Błąd wczytywania danych gildii: {e}")
+        return {}
+    if configs:
+        print(f"Wczytano dane dostępowe dla {len(configs)} gildii")
+    return configs
+
+
+tenant_configs = load_tenants()
+
+# Utworzeni najemcy: id gildii -> Tenant (tworzeni przy pierwszym użyciu, usuwani po bezczynności)
+tenants = {}
+
+# Gildie bez własnych danych - wspólni klienci domyślni (nigdy nie usuwani)
+default_tenant = Tenant(DEFAULT_TENANT, jira_client.jira, jira_client.tempo)
+
+
+def create_tenant(config):
+    print(f"Tworzenie klientów JIRA/Tempo dla gildii {config.name}")
+    return Tenant(
+        config.name,
+        JiraClient(config.jira_server, config.jira_email, config.jira_api_token, config.max_connections),
+        create_tempo_client(config.tempo_api_base, config.tempo_api_token, config.max_connections),
+        config.max_concurrency
+    )
+
+
+def get_tenant(guild_id):
+    """Zwróć najemcę gildii (klienci tworzeni przy pierwszym użyciu); gildie bez wpisu - domyślny"""
+    key = str(guild_id) if guild_id is not None else None
+    config = tenant_configs.get(key)
+    if config is None:
+        default_tenant.touch()
+        return default_tenant
+
+    tenant = tenants.get(key)
+    if tenant is None:
+        tenant = tenants[key] = create_tenant(config)
+    tenant.touch()
+    return tenant
+
+
+async def evict_idle(idle_seconds=TENANT_IDLE_MINUTES * 60):
+    """Zamknij pule połączeń gildii nieużywanych dłużej niż idle_seconds; zwraca ich liczbę"""
+    now = time.monotonic()
+    idle = [guild_id for guild_id, tenant in tenants.items() if tenant.is_idle(now, idle_seconds)]
+    for guild_id in idle:
+        tenant = tenants.pop(guild_id)
+        await tenant.close()
+        print(f"Zamknięto nieużywane połączenia gildii {tenant.name}")
+    return len(idle)
+
+
+async def close_tenants():
+    """Zamknij pule połączeń wszystkich gildii"""
+    for guild_id in list(tenants):
+        await tenants.pop(guild_id).close()
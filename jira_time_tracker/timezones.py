@@ -0,0 +1,64 @@
+from dataclasses import replace
+from zoneinfo import ZoneInfo
+
+from . import directory, tenants
+from .settings import DEFAULT_TIME_ZONE
+
+# Strefy czasowe użytkowników JIRA, pobierane raz na użytkownika
+user_time_zones = {}  # (najemca, accountId) -> ZoneInfo (None - strefa serwera)
+
+
+def load_zone(name):
+    """Zwróć strefę czasową o podanej nazwie albo None, jeśli nazwa jest nieznana"""
+    try:
+        return ZoneInfo(name)
+    except Exception as e:
+        print(f"Nieznana strefa czasowa {name}: {e}")
+        return None
+
+
+# Czy pobierać strefy z JIRA; bez tego (odtwarzanie nagrań offline) używany jest tylko katalog
+# użytkowników i strefa domyślna
+remote_lookup = True
+
+# Strefa domyślna z konfiguracji; None oznacza strefę serwera (astimezone(None) uwzględnia DST)
+default_time_zone = load_zone(DEFAULT_TIME_ZONE) if DEFAULT_TIME_ZONE else None
+
+
+async def fetch_user_time_zone(account_id, tenant):
+    """Pobierz nazwę strefy czasowej użytkownika (z katalogu albo z JIRA gildii)"""
+    # Katalog użytkowników jest pobierany z domyślnej instancji JIRA
+    user = directory.jira_users.get(account_id) if tenant is tenants.default_tenant else None
+    if user and user.get('timeZone'):
+        return user['timeZone']
+    if not remote_lookup:
+        return None
+    return (await tenant.jira.user(account_id)).get('timeZone')
+
+
+async def user_time_zone(account_id, guild_id=None):
+    """Zwróć strefę czasową użytkownika JIRA (pobraną raz i zapamiętaną) albo strefę domyślną"""
+    if not account_id:
+        return default_time_zone
+
+    tenant = tenants.get_tenant(guild_id)
+    key = (tenant.name, account_id)
+    if key in user_time_zones:
+        return user_time_zones[key]
+
+    try:
+        name = await fetch_user_time_zone(account_id, tenant)
+    except Exception as e:
+        # Bez zapamiętywania - spróbujemy ponownie przy kolejnym worklogu
+        print(f"Błąd pobierania strefy czasowej użytkownika {account_id}: {e}")
+        return default_time_zone
+
+    zone = (load_zone(name) if name else None) or default_time_zone
+    user_time_zones[key] = zone
+    return zone
+
+
+async def localize(entry):
+    """Zwróć kopię worklogu z czasami w strefie czasowej użytkownika"""
+    zone = await user_time_zone(entry.jira_account_id, entry.guild_id)
+    return replace(entry, start_time=entry.start_time.astimezone(zone), end_time=entry.end_time.astimezone(zone))
@@ -0,0 +1,84 @@
+import os
+import threading
+import time
+
+from . import storage
+from .settings import CONFIG_FILE, CONFIG_POLL_SECONDS, TASKS_FILE
+
+try:
+    # watchdog używa inotify na Linuksie; bez niego pliki są sprawdzane okresowo (mtime)
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+WATCHED_FILES = {os.path.abspath(TASKS_FILE), os.path.abspath(CONFIG_FILE)}
+
+# Krótka zwłoka, żeby seria zdarzeń z jednego zapisu dała jedno przeładowanie
+DEBOUNCE_SECONDS = 0.5
+
+
+def reload_changed_files():
+    """Przeładuj pliki konfiguracyjne; niepoprawne pliki nie zmieniają stanu"""
+    try:
+        snapshot = storage.reload_files()
+        print(f"Przeładowano konfigurację z plików: {len(snapshot.channel_tasks)} kanałów, "
+              f"{len(snapshot.channel_rules)} reguł, {len(snapshot.user_mappings)} użytkowników")
+    except Exception as e:
+        print(f"Pominięto przeładowanie konfiguracji - błąd w pliku: {e}")
+
+
+class ConfigFileHandler(FileSystemEventHandler):
+    """Reaguje na zmiany tasks.json/config.json zgłoszone przez watchdog"""
+
+    def __init__(self):
+        self.timer = None
+        self.lock = threading.Lock()
+
+    def on_any_event(self, event):
+        paths = {os.path.abspath(event.src_path), os.path.abspath(getattr(event, 'dest_path', '') or '')}
+        if not paths & WATCHED_FILES:
+            return
+
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.timer = threading.Timer(DEBOUNCE_SECONDS, reload_changed_files)
+            self.timer.daemon = True
+            self.timer.start()
+
+
+def file_mtimes():
+    """Zwróć czasy modyfikacji obserwowanych plików"""
+    return {path: os.path.getmtime(path) if os.path.exists(path) else None for path in WATCHED_FILES}
+
+
+def poll_files(stop_event):
+    """Sprawdzaj okresowo czasy modyfikacji plików (gdy watchdog jest niedostępny)"""
+    last = file_mtimes()
+    while not stop_event.wait(CONFIG_POLL_SECONDS):
+        current = file_mtimes()
+        if current != last:
+            time.sleep(DEBOUNCE_SECONDS)
+            last = file_mtimes()
+            reload_changed_files()
+
+
+def start_config_watcher():
+    """Uruchom obserwowanie plików konfiguracyjnych w tle; zwraca funkcję zatrzymującą"""
+    if Observer is not None:
+        observer = Observer()
+        directories = {os.path.dirname(path) for path in WATCHED_FILES}
+        for directory in directories:
+            observer.schedule(ConfigFileHandler(), directory, recursive=False)
+        observer.daemon = True
+        observer.start()
+        print("Obserwowanie plików konfiguracyjnych (inotify/watchdog)")
+        return observer.stop
+
+    stop_event = threading.Event()
+    thread = threading.Thread(target=poll_files, args=(stop_event,), daemon=True)
+    thread.start()
+    print(f"Obserwowanie plików konfiguracyjnych (co {CONFIG_POLL_SECONDS} s)")
+    return stop_event.set
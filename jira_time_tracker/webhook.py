@@ -0,0 +1,202 @@
+import hmac
+import math
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from flask import Flask, request, jsonify
+from werkzeug.serving import make_server
+
+from . import aggregation, backends, clock, outbox, recorder, storage, timezones
+from .jira_client import run_sync
+from .ratelimit import KeyedRateLimiter
+from .settings import (
+    WEBHOOK_CHANNEL_RATE, WEBHOOK_CLIENT_RATE, WEBHOOK_HOST, WEBHOOK_MAX_BODY_BYTES, WEBHOOK_MAX_PENDING,
+    WEBHOOK_PORT, WEBHOOK_TOKEN, WEBHOOK_USER_RATE
+)
+from .worklog import build_entry
+
+# Inicjalizacja serwera Flask
+app = Flask(__name__)
+# Większe żądania Flask odrzuca sam (413), zanim przeczyta treść
+app.config['MAX_CONTENT_LENGTH'] = WEBHOOK_MAX_BODY_BYTES
+
+# Limity żądań - osobno dla klienta (adres IP), użytkownika i kanału
+client_limiter = KeyedRateLimiter(WEBHOOK_CLIENT_RATE)
+user_limiter = KeyedRateLimiter(WEBHOOK_USER_RATE)
+channel_limiter = KeyedRateLimiter(WEBHOOK_CHANNEL_RATE)
+
+# Ograniczenie liczby worklogów zapisywanych jednocześnie; nadmiar jest odrzucany (429)
+pending_submissions = threading.BoundedSemaphore(WEBHOOK_MAX_PENDING)
+OVERLOAD_RETRY_AFTER = 5
+
+# Najdłuższy przyjmowany czas aktywności (24h) - większe wartości to błąd klienta, nie rozmowa
+MAX_DURATION_MINUTES = 24 * 60
+
+# Serwer HTTP i flaga przyjmowania żądań - przy zamykaniu bota nowe worklogi są odrzucane (503)
+server = None
+accepting = True
+
+# Liczniki przyjętych i odrzuconych żądań
+stats = Counter()
+stats_lock = threading.Lock()
+
+
+def count(name):
+    with stats_lock:
+        stats[name] += 1
+
+
+def reject(reason, message, status, retry_after=None):
+    """Zwróć odpowiedź z błędem i policz odrzucone żądanie"""
+    count(f"rejected_{reason}")
+    response = jsonify({'status': 'error', 'message': message})
+    response.status_code = status
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+
+def is_identifier(value):
+    """Sprawdź identyfikator z żądania (ID Discord jako tekst albo liczba; bool nie jest liczbą)"""
+    return isinstance(value, (str, int)) and not isinstance(value, bool)
+
+
+def is_authorized():
+    """Sprawdź wspólny sekret (jeśli skonfigurowany)"""
+    if not WEBHOOK_TOKEN:
+        return True
+    header = request.headers.get('Authorization', '')
+    return hmac.compare_digest(header, f"Bearer {WEBHOOK_TOKEN}")
+
+
+@app.errorhandler(413)
+def request_too_large(error):
+    return reject('too_large', 'Zbyt duże żądanie', 413)
+
+
+@app.route('/webhook/stats', methods=['GET'])
+def webhook_stats():
+    if not is_authorized():
+        return reject('auth', 'Brak autoryzacji', 401)
+    with stats_lock:
+        return jsonify(dict(stats))
+
+
+@app.route('/webhook/voice-activity', methods=['POST'])
+def voice_activity_webhook():
+    if not is_authorized():
+        return reject('auth', 'Brak autoryzacji', 401)
+
+    if not accepting:
+        return reject('shutdown', 'Serwer jest zamykany, spróbuj później', 503, OVERLOAD_RETRY_AFTER)
+
+    recorder.record_webhook(request.remote_addr, request.get_data(as_text=True))
+
+    allowed, retry_after = client_limiter.try_acquire(request.remote_addr)
+    if not allowed:
+        return reject('rate_client', 'Przekroczono limit żądań klienta', 429, retry_after)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return reject('invalid', 'Oczekiwano obiektu JSON', 400)
+
+    user_id = data.get('user_id')
+    channel_id = data.get('channel_id')
+    guild_id = data.get('guild_id')
+    duration_minutes = data.get('duration_minutes')
+
+    # JSON dopuszcza NaN i Infinity, a bool jest podtypem int - oba odrzucane jak pozostałe błędne wartości
+    if (not isinstance(duration_minutes, (int, float)) or isinstance(duration_minutes, bool)
+            or not math.isfinite(duration_minutes)
+            or not 0 < duration_minutes <= MAX_DURATION_MINUTES):
+        return reject('invalid', f'Nieprawidłowa wartość duration_minutes (oczekiwano liczby minut '
+                                 f'od 0 do {MAX_DURATION_MINUTES})', 400)
+
+    if user_id is not None and not is_identifier(user_id):
+        return reject('invalid', 'Nieprawidłowa wartość user_id', 400)
+    if not isinstance(data.get('user_name', ''), str):
+        return reject('invalid', 'Nieprawidłowa wartość user_name', 400)
+    # Pola kanału trafiają do reguł kanałów (wyrażenia regularne na nazwie) - inny typ to błąd klienta, nie 500
+    if not is_identifier(channel_id):
+        return reject('invalid', 'Nieprawidłowa wartość channel_id', 400)
+    for field in ('category_id', 'guild_id'):
+        if data.get(field) is not None and not is_identifier(data[field]):
+            return reject('invalid', f'Nieprawidłowa wartość {field}', 400)
+    if not isinstance(data.get('channel_name', ''), str):
+        return reject('invalid', 'Nieprawidłowa wartość channel_name', 400)
+    channel_id = str(channel_id)
+
+    # Klucze mapowań w config.json są tekstowe - liczbowe ID inaczej nigdy by do nich nie pasowało
+    user_id = str(user_id) if user_id is not None else None
+
+    if user_id:
+        allowed, retry_after = user_limiter.try_acquire(user_id)
+        if not allowed:
+            return reject('rate_user', 'Przekroczono limit żądań użytkownika', 429, retry_after)
+
+    allowed, retry_after = channel_limiter.try_acquire(channel_id)
+    if not allowed:
+        return reject('rate_channel', 'Przekroczono limit żądań kanału', 429, retry_after)
+
+    # Jedna migawka na całe żądanie - spójny odczyt bez blokad
+    snapshot = storage.snapshot
+
+    # Sprawdź czy mamy mapowanie dla tego kanału (wpis w tasks.json albo reguła)
+    task_info = snapshot.router.resolve(channel_id, data.get('channel_name'), data.get('category_id'))
+    if task_info is None:
+        return jsonify({'status': 'error', 'message': 'Kanał nie ma przypisanego zadania'}), 400
+
+    # Oblicz przybliżony czas rozpoczęcia (teraz - czas trwania); ułamki minut są zaokrąglane
+    # dopiero przy formatowaniu czasu dla JIRA
+    start_time = clock.utc_now() - timedelta(minutes=duration_minutes)
+
+    entry = build_entry(
+        issue_key=task_info['zadanie'],
+        start_time=start_time,
+        duration_seconds=duration_minutes * 60,
+        jira_account_id=snapshot.user_mappings.get(user_id) if user_id else None,
+        discord_name=data.get('user_name', user_id or 'webhook'),
+        channel_name=data.get('channel_name', 'Kanał Discord'),
+        # Gildia wybiera dane dostępowe JIRA/Tempo (bez niej - domyślne)
+        guild_id=str(guild_id) if guild_id else None
+    )
+    entry = run_sync(timezones.localize(entry))
+
+    if aggregation.ENABLED:
+        aggregation.add_entry(entry)
+        count('aggregated')
+        return jsonify({'status': 'success', 'aggregated': True})
+
+    # Odrzuć żądanie od razu, jeśli za dużo worklogów jest już w trakcie zapisywania
+    if not pending_submissions.acquire(blocking=False):
+        return reject('overload', 'Serwer jest przeciążony, spróbuj później', 429, OVERLOAD_RETRY_AFTER)
+
+    try:
+        with outbox.tracking(entry):
+            run_sync(backends.submit_worklog(entry))
+        count('accepted')
+        return jsonify({'status': 'success'})
+    except Exception as e:
+        count('failed')
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+    finally:
+        pending_submissions.release()
+
+
+# Funkcja uruchamiająca serwer Flask
+def run_flask():
+    global server
+    # Każde żądanie w osobnym wątku - odczyty z migawki bez blokad, wywołania JIRA/Tempo przekazywane
+    # przez run_sync do pętli zdarzeń bota - wspólni klienci, jak w komendach
+    server = make_server(WEBHOOK_HOST, WEBHOOK_PORT, app, threaded=True)
+    print(f"Webhook nasłuchuje na {WEBHOOK_HOST}:{WEBHOOK_PORT}")
+    server.serve_forever()
+
+
+def stop_flask():
+    """Przestań przyjmować żądania i zatrzymaj serwer (żądania w trakcie kończą się w swoich wątkach)"""
+    global accepting
+    accepting = False
+    if server is not None:
+        server.shutdown()
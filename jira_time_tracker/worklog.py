@@ -0,0 +1,80 @@
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+# Budowanie worklogów - czyste funkcje, bez JIRA, Discord i stanu (wspólne dla sesji głosowych,
+# webhooka, agregacji i symulacji)
+
+# JIRA odrzuca worklog z czasem 0m, więc każdy zapisany worklog ma co najmniej minutę
+MIN_WORKLOG_MINUTES = 1
+
+TIME_SPENT_PATTERN = re.compile(r'^(?:(\d+)h(?: (?=\d))?)?(?:(\d+)m)?$')
+
+
+def worklog_minutes(duration_minutes):
+    """Zaokrąglij czas do pełnych minut (połowa minuty w górę, najmniej MIN_WORKLOG_MINUTES)"""
+    return max(MIN_WORKLOG_MINUTES, int(duration_minutes + 0.5))
+
+
+def format_time_spent(duration_minutes):
+    """Sformatuj czas w minutach do formatu JIRA (np. "2h 30m"), zaokrąglając do pełnych minut"""
+    hours, minutes = divmod(worklog_minutes(duration_minutes), 60)
+
+    time_spent = ""
+    if hours > 0:
+        time_spent += f"{hours}h "
+    if minutes > 0 or time_spent == "":
+        time_spent += f"{minutes}m"
+    return time_spent.strip()
+
+
+def parse_time_spent(time_spent):
+    """Zamień czas w formacie JIRA ("2h 30m") na minuty; przy nieprawidłowym formacie rzuca ValueError"""
+    match = TIME_SPENT_PATTERN.match(time_spent)
+    if not time_spent or match is None:
+        raise ValueError(f"Nieprawidłowy format czasu: {time_spent!r}")
+    hours, minutes = match.groups()
+    return int(hours or 0) * 60 + int(minutes or 0)
+
+
+@dataclass
+class WorklogEntry:
+    """Pojedynczy worklog do zapisania przez backend"""
+    issue_key: str
+    start_time: datetime
+    end_time: datetime
+    duration_seconds: int
+    jira_account_id: Optional[str]
+    discord_name: str
+    channel_name: str
+    # Gildia Discord - wybiera dane dostępowe JIRA/Tempo (None - domyślne)
+    guild_id: Optional[str] = None
+
+    @property
+    def time_spent(self):
+        return format_time_spent(self.duration_seconds / 60)
+
+    @property
+    def time_range(self):
+        return f"{self.start_time.strftime('%H:%M')} - {self.end_time.strftime('%H:%M')}"
+
+    @property
+    def description(self):
+        return f"Auto log Discord - kanał: {self.channel_name} ({self.time_range})"
+
+
+def build_entry(issue_key, start_time, duration_seconds, jira_account_id, discord_name, channel_name,
+                guild_id=None):
+    """Zbuduj worklog z czasu rozpoczęcia i długości (w sekundach, zaokrąglanej do pełnych sekund)"""
+    duration_seconds = round(duration_seconds)
+    return WorklogEntry(
+        issue_key=issue_key,
+        start_time=start_time,
+        end_time=start_time + timedelta(seconds=duration_seconds),
+        duration_seconds=duration_seconds,
+        jira_account_id=jira_account_id,
+        discord_name=discord_name,
+        channel_name=channel_name,
+        guild_id=guild_id
+    )
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Testy uruchamiane z katalogu repozytorium lub z tests/ - pakiet jest importowany z katalogu nadrzędnego
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
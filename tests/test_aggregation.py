@@ -0,0 +1,172 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from jira_time_tracker import aggregation, backends
+from jira_time_tracker.worklog import build_entry
+
+WARSAW = timezone(timedelta(hours=2))
+MONDAY = datetime(2024, 6, 3, 9, 0, tzinfo=WARSAW)
+
+
+@pytest.fixture
+def pending(tmp_path, monkeypatch):
+    monkeypatch.setattr(aggregation, 'AGGREGATION_MODE', 'daily')
+    monkeypatch.setattr(aggregation, 'AGGREGATION_FILE', str(tmp_path / 'pending_worklogs.json'))
+    aggregation.pending.clear()
+    aggregation.in_flight.clear()
+    yield aggregation.pending
+    aggregation.pending.clear()
+    aggregation.in_flight.clear()
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    entries = []
+
+    async def submit_worklog(entry):
+        entries.append(entry)
+
+    monkeypatch.setattr(backends, 'submit_worklog', submit_worklog)
+    return entries
+
+
+def session(start_time, minutes, user='acc', issue_key='PROJ-1', channel='kanał', guild_id=None):
+    return build_entry(issue_key, start_time, minutes * 60, user, user, channel, guild_id)
+
+
+def test_sessions_of_one_day_are_summed(pending):
+    aggregation.add_entry(session(MONDAY, 30, channel='a'))
+    total = aggregation.add_entry(session(MONDAY + timedelta(hours=2), 45, channel='b'))
+
+    assert total == 75 * 60
+    [bucket] = pending.values()
+    assert bucket['sessions'] == 2
+    assert bucket['channel_names'] == {'a', 'b'}
+    assert bucket['end_time'] == MONDAY + timedelta(hours=2, minutes=45)
+
+
+def test_keys_separate_users_issues_days_and_guilds(pending):
+    for entry in (session(MONDAY, 10), session(MONDAY, 10, user='other'), session(MONDAY, 10, issue_key='PROJ-2'),
+                  session(MONDAY + timedelta(days=1), 10), session(MONDAY, 10, guild_id='1')):
+        aggregation.add_entry(entry)
+    assert len(pending) == 5
+
+
+def test_weekly_period_starts_on_monday(pending, monkeypatch):
+    monkeypatch.setattr(aggregation, 'AGGREGATION_MODE', 'weekly')
+    assert aggregation.period_key(MONDAY + timedelta(days=4)) == '2024-06-03'
+    assert aggregation.due_at('2024-06-03', WARSAW).date().isoformat() == '2024-06-07'
+
+
+def test_pending_survives_restart(pending):
+    aggregation.add_entry(session(MONDAY, 30))
+    saved = dict(pending)
+    pending.clear()
+
+    aggregation.load_pending()
+    assert pending.keys() == saved.keys()
+    [bucket] = pending.values()
+    assert bucket['start_time'] == MONDAY
+    assert bucket['start_time'].utcoffset() == timedelta(hours=2)
+
+
+def test_legacy_records_are_upgraded(pending):
+    key, bucket = aggregation.from_record({
+        'key': ['acc', 'PROJ-1', '2024-06-03'], 'issue_key': 'PROJ-1', 'jira_account_id': 'acc',
+        'discord_name': 'acc', 'channel_names': ['a'], 'start_time': '2024-06-03T09:00:00',
+        'end_time': '2024-06-03T09:30:00', 'duration_seconds': 1800, 'sessions': 1,
+    })
+    assert key == ('', 'acc', 'PROJ-1', '2024-06-03')
+    assert bucket['guild_id'] is None
+    assert bucket['start_time'].tzinfo is not None
+
+
+def test_flush_sends_only_due_periods(pending, submitted):
+    aggregation.add_entry(session(MONDAY, 30))
+    aggregation.add_entry(session(MONDAY + timedelta(days=1), 30))
+
+    now = aggregation.due_at('2024-06-03', WARSAW)
+    assert asyncio.run(aggregation.flush(now=now)) == (1, 0)
+    assert [entry.start_time for entry in submitted] == [MONDAY]
+    assert len(pending) == 1
+    with open(aggregation.AGGREGATION_FILE, encoding='utf-8') as f:
+        assert len(json.load(f)) == 1
+
+
+def test_failed_flush_keeps_worklog(pending, monkeypatch):
+    async def submit_worklog(entry):
+        raise RuntimeError("JIRA niedostępna")
+
+    monkeypatch.setattr(backends, 'submit_worklog', submit_worklog)
+    aggregation.add_entry(session(MONDAY, 30))
+    assert asyncio.run(aggregation.flush(force=True)) == (0, 1)
+    assert len(pending) == 1
+
+
+def test_aggregated_total_is_conserved(pending, submitted):
+    minutes = [7, 13, 29, 41, 55]
+    for offset, length in enumerate(minutes):
+        aggregation.add_entry(session(MONDAY + timedelta(hours=offset), length))
+
+    asyncio.run(aggregation.flush(force=True))
+    [entry] = submitted
+    assert entry.duration_seconds == sum(minutes) * 60
+    assert entry.time_spent == "2h 25m"
+
+
+def saved_keys():
+    with open(aggregation.AGGREGATION_FILE, encoding='utf-8') as f:
+        return sorted(record['key'][2] for record in json.load(f))
+
+
+def test_flush_persists_after_each_submission(pending, monkeypatch):
+    seen_on_disk = []
+
+    async def submit_worklog(entry):
+        # Stan pliku w chwili wysyłania - tak zastałby go restart po awarii
+        seen_on_disk.append(saved_keys())
+
+    monkeypatch.setattr(backends, 'submit_worklog', submit_worklog)
+    for issue_key in ('PROJ-1', 'PROJ-2', 'PROJ-3'):
+        aggregation.add_entry(session(MONDAY, 30, issue_key=issue_key))
+
+    assert asyncio.run(aggregation.flush(force=True)) == (3, 0)
+    assert seen_on_disk == [['PROJ-1', 'PROJ-2', 'PROJ-3'], ['PROJ-2', 'PROJ-3'], ['PROJ-3']]
+    assert saved_keys() == []
+
+
+def test_sessions_added_during_flush_are_kept(pending, monkeypatch):
+    async def submit_worklog(entry):
+        aggregation.add_entry(session(MONDAY + timedelta(hours=3), 15))
+        raise RuntimeError("JIRA niedostępna")
+
+    monkeypatch.setattr(backends, 'submit_worklog', submit_worklog)
+    aggregation.add_entry(session(MONDAY, 30))
+    asyncio.run(aggregation.flush(force=True))
+
+    [bucket] = pending.values()
+    assert bucket['duration_seconds'] == 45 * 60
+    pending.clear()
+    aggregation.load_pending()
+    [bucket] = pending.values()
+    assert bucket['duration_seconds'] == 45 * 60
+
+
+def test_in_flight_and_new_sessions_are_merged_on_restart(pending, monkeypatch):
+    async def submit_worklog(entry):
+        # Nowa sesja w trakcie wysyłania, a potem awaria przed potwierdzeniem
+        aggregation.add_entry(session(MONDAY + timedelta(hours=3), 15))
+        raise SystemExit
+
+    monkeypatch.setattr(backends, 'submit_worklog', submit_worklog)
+    aggregation.add_entry(session(MONDAY, 30))
+    with pytest.raises(SystemExit):
+        asyncio.run(aggregation.flush(force=True))
+
+    pending.clear()
+    aggregation.load_pending()
+    [bucket] = pending.values()
+    assert bucket['duration_seconds'] == 45 * 60
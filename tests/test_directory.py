@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+
+from jira_time_tracker import directory
+
+
+class FakeJira:
+    """Lista użytkowników JIRA podzielona na strony, każda z własnym ETagiem"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    async def users_page(self, start_at, max_results, etag=None):
+        index = start_at // max_results
+        self.requests.append((index, etag))
+        page = self.pages[index] if index < len(self.pages) else []
+        page_etag = f'"{index}-{len(page)}-{page[:1] and page[0]["accountId"]}"'
+        if etag == page_etag:
+            return 304, {}, None
+        return 200, {'ETag': page_etag}, page
+
+
+def users(prefix, count):
+    return [{'accountId': f"{prefix}{i}", 'displayName': f"{prefix} {i}", 'accountType': 'atlassian'}
+            for i in range(count)]
+
+
+@pytest.fixture
+def fake_jira(monkeypatch):
+    monkeypatch.setattr(directory, 'JIRA_USERS_PAGE_SIZE', 2)
+    monkeypatch.setattr(directory, 'jira_user_pages', [])
+    fake = FakeJira([users('a', 2), users('b', 2), users('c', 1)])
+    monkeypatch.setattr(directory, 'jira', fake)
+    return fake
+
+
+def fetch():
+    return asyncio.run(directory.fetch_jira_users())
+
+
+def test_unchanged_pages_return_none(fake_jira):
+    assert len(fetch()) == 5
+    fake_jira.requests.clear()
+    assert fetch() is None
+    assert [etag is not None for _, etag in fake_jira.requests] == [True, True, True]
+
+
+def test_change_on_later_page_is_not_missed(fake_jira):
+    fetch()
+    fake_jira.pages[1] = users('d', 2)
+    found = fetch()
+    assert [user['accountId'] for user in found] == ['a0', 'a1', 'd0', 'd1', 'c0']
+
+
+def test_removed_page_is_a_change(fake_jira):
+    fetch()
+    fake_jira.pages[2] = []
+    assert [user['accountId'] for user in fetch()] == ['a0', 'a1', 'b0', 'b1']
+
+
+class FakeTenant:
+    """Gildia z własną JIRA, w której wyszukiwanie zwraca stałą listę"""
+
+    def __init__(self, found):
+        self.jira = self
+        self.found = found
+        self.queries = []
+
+    async def search_users(self, query, max_results=10):
+        self.queries.append(query)
+        return self.found
+
+
+def test_tenant_search_skips_default_directory(monkeypatch):
+    monkeypatch.setattr(directory, 'jira', None)
+    directory.rebuild_jira_user_directory([directory_entry('default-user', 'Anna Domyślna')])
+    tenant = FakeTenant([{'accountId': 'tenant-user', 'displayName': 'Anna Gildia'}])
+
+    found = asyncio.run(directory.search_jira_users('anna', tenant))
+    assert [user['accountId'] for user in found] == ['tenant-user']
+    assert 'tenant-user' not in directory.jira_users
+
+    choices = asyncio.run(directory.autocomplete_jira_users('an', tenant))
+    assert [user['accountId'] for user in choices] == ['tenant-user']
+    assert asyncio.run(directory.autocomplete_jira_users('', tenant)) == []
+    directory.rebuild_jira_user_directory([])
+
+
+def directory_entry(account_id, name):
+    return {'accountId': account_id, 'displayName': name, 'email': '', 'timeZone': None}
+
+
+def test_remembered_users_are_searchable():
+    directory.rebuild_jira_user_directory([directory_entry(f"id{i}", f"Osoba {i}") for i in range(50)])
+    before = directory.jira_user_trigrams
+
+    directory.remember_jira_users([])
+    assert directory.jira_user_trigrams is before
+
+    directory.remember_jira_users([{'accountId': 'new', 'displayName': 'Zenon Nowy'}, {'accountId': 'id1'}])
+    assert [user['accountId'] for user in directory.lookup_jira_users('zenon')] == ['new']
+    assert [user['accountId'] for user in directory.lookup_jira_users('zneon nowy')] == ['new']
+    assert directory.jira_users['id1']['displayName'] == 'Osoba 1'
+    assert directory.jira_user_prefixes == sorted(directory.jira_user_prefixes)
+    assert 'new' not in before.get('zen', ())
+    directory.rebuild_jira_user_directory([])
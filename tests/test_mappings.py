@@ -0,0 +1,78 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+from jira_time_tracker import mappings, storage
+
+RULES = [
+    {'category_id': '123', 'name_pattern': '^standup', 'projekt': 'OPS', 'zadanie': 'OPS-1'},
+    {'issue_key_in_name': True},
+]
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'TASKS_FILE', str(tmp_path / 'tasks.json'))
+    monkeypatch.setattr(storage, 'CONFIG_FILE', str(tmp_path / 'config.json'))
+    previous = storage.snapshot
+    storage.publish({'1': {'projekt': 'PROJ', 'zadanie': 'PROJ-1'}}, {'2': 'acc'}, RULES)
+    yield tmp_path
+    storage.snapshot = previous
+
+
+@pytest.mark.parametrize('export, filename', [
+    (mappings.export_json, 'mappings.json'),
+    (lambda: "".join(mappings.iter_export_csv()), 'mappings.csv'),
+])
+def test_export_round_trips_channel_rules(files, monkeypatch, export, filename):
+    monkeypatch.setattr(mappings.jira, 'ensure_connected', lambda: asyncio.sleep(0, False))
+    tasks, users, rules, errors = asyncio.run(mappings.prepare_import(export(), filename))
+    assert errors == []
+    assert rules == RULES
+    assert tasks == storage.snapshot.tasks_dict()
+    assert users == storage.snapshot.mappings_dict()
+
+
+def test_import_replaces_rules_and_writes_config(files):
+    mappings.apply_import({}, {}, [{'issue_key_in_name': True}])
+    assert [dict(rule) for rule in storage.snapshot.channel_rules] == [{'issue_key_in_name': True}]
+    with open(storage.CONFIG_FILE, encoding='utf-8') as f:
+        config = json.load(f)
+    assert config == {'user_mappings': {'2': 'acc'}, 'channel_rules': [{'issue_key_in_name': True}]}
+
+
+def test_import_without_rules_keeps_them(files):
+    mappings.apply_import({}, {'3': 'other'}, None)
+    assert [dict(rule) for rule in storage.snapshot.channel_rules] == RULES
+
+
+def test_invalid_rule_is_reported(files, monkeypatch):
+    monkeypatch.setattr(mappings.jira, 'ensure_connected', lambda: asyncio.sleep(0, False))
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=mappings.IMPORT_CSV_FIELDS)
+    writer.writeheader()
+    writer.writerow({'typ': 'rule', 'name_pattern': '('})
+    *_, errors = asyncio.run(mappings.prepare_import(buffer.getvalue(), 'mappings.csv'))
+    assert errors == ['Nieprawidłowa reguła kanału: reguła 1: brak projektu i zadania (albo issue_key_in_name)']
+
+
+@pytest.mark.parametrize('content, filename', [
+    ('{"channel_tasks": {"123": {"zadanie": "PROJ-1"}}}', 'mappings.json'),
+    ('{"channel_tasks": {"1": "PROJ-1"}}', 'mappings.json'),
+    ('{"user_mappings": {"123": 5}}', 'mappings.json'),
+    ('[1, 2]', 'mappings.json'),
+    ('{"channel_tasks": []}', 'mappings.json'),
+    ('{"channel_rules": {}}', 'mappings.json'),
+    ('{bad', 'mappings.json'),
+    ('id,projekt,zadanie\n1,PROJ,PROJ-1\n', 'mappings.csv'),
+    ('typ,id\ntask,1\n', 'mappings.csv'),
+    ('typ,id\nuser,1\n', 'mappings.csv'),
+    ('typ,id\nkanał,1\n', 'mappings.csv'),
+])
+def test_malformed_import_is_reported(files, monkeypatch, content, filename):
+    monkeypatch.setattr(mappings.jira, 'ensure_connected', lambda: asyncio.sleep(0, False))
+    *_, errors = asyncio.run(mappings.prepare_import(content, filename))
+    assert errors
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from jira_time_tracker import discord_bot, meetings, storage
+
+TASK = {'projekt': 'PROJ', 'zadanie': 'PROJ-1'}
+
+
+def test_meeting_closes_when_last_participant_leaves():
+    meetings.join('1', 'a')
+    meetings.join('1', 'b')
+    assert meetings.leave('1', 'a', 'segment-a') is None
+    assert meetings.leave('1', 'b', 'segment-b') == ['segment-a', 'segment-b']
+    assert meetings.meetings == {}
+
+
+def test_take_all_returns_waiting_segments():
+    meetings.join('1', 'a')
+    meetings.join('1', 'b')
+    meetings.leave('1', 'a', 'segment-a')
+    assert meetings.take_all() == ['segment-a']
+    assert meetings.meetings == {}
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, member_id):
+        self.id = member_id
+        self.name = f"user{member_id}"
+
+    async def send(self, message):
+        pass
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.voice_channels = []
+        self.stage_channels = []
+        self.members = {}
+
+    def get_channel(self, channel_id):
+        return next((channel for channel in self.voice_channels if channel.id == channel_id), None)
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+
+@pytest.fixture
+def voice(monkeypatch):
+    guild = FakeGuild(100)
+    channel = SimpleNamespace(id=10, name='spotkanie', guild=guild, category_id=None, members=[])
+    guild.voice_channels.append(channel)
+    for member_id in (1, 2):
+        guild.members[member_id] = FakeMember(member_id)
+
+    closed = []
+
+    async def close_meeting(channel, segments):
+        closed.append((channel, segments))
+
+    monkeypatch.setattr(discord_bot, 'bot', SimpleNamespace(guilds=[guild]))
+    monkeypatch.setattr(discord_bot, 'MEETING_SUMMARY_CHANNEL', '999')
+    monkeypatch.setattr(discord_bot, 'close_meeting', close_meeting)
+    monkeypatch.setattr(storage, 'snapshot', storage.build_snapshot({'10': TASK}, {}))
+    discord_bot.active_sessions.clear()
+    meetings.meetings.clear()
+    yield SimpleNamespace(guild=guild, channel=channel, closed=closed)
+    discord_bot.active_sessions.clear()
+    meetings.meetings.clear()
+
+
+def test_reconnect_closes_sessions_of_members_who_left(voice):
+    voice.channel.members = [voice.guild.members[1], voice.guild.members[2]]
+    asyncio.run(discord_bot.reconcile_voice_sessions())
+    assert set(discord_bot.active_sessions) == {1, 2}
+
+    # Obaj wyszli podczas rozłączenia - zdarzenia wyjścia przepadły
+    for session in discord_bot.active_sessions.values():
+        session['start_monotonic'] -= 600
+    voice.channel.members = []
+    asyncio.run(discord_bot.reconcile_voice_sessions())
+
+    assert discord_bot.active_sessions == {}
+    assert meetings.meetings == {}
+    [(channel, segments)] = voice.closed
+    assert channel is voice.channel
+    assert sorted(entry.discord_name for entry, _, _ in segments) == ['user1', 'user2']
+
+
+def test_reconnect_keeps_members_still_present(voice):
+    voice.channel.members = [voice.guild.members[1], voice.guild.members[2]]
+    asyncio.run(discord_bot.reconcile_voice_sessions())
+    voice.channel.members = [voice.guild.members[2]]
+    asyncio.run(discord_bot.reconcile_voice_sessions())
+
+    assert set(discord_bot.active_sessions) == {2}
+    assert meetings.meetings['10'].participants == {2}
+    assert voice.closed == []
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from jira_time_tracker import clock
+from jira_time_tracker.ratelimit import KeyedRateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Zegar przesuwany ręcznie przez test"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def utc_now(self):
+        return datetime.fromtimestamp(self.now, timezone.utc)
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    fake = FakeClock()
+    clock.set_clock(fake)
+    yield fake
+    clock.set_clock(clock.SystemClock())
+
+
+def test_bucket_allows_burst_up_to_capacity(fake_clock):
+    bucket = TokenBucket(5)
+    assert all(bucket.try_acquire()[0] for _ in range(5))
+    assert bucket.try_acquire() == (False, 12)
+
+
+def test_bucket_refills_over_time(fake_clock):
+    bucket = TokenBucket(60)
+    for _ in range(60):
+        bucket.try_acquire()
+    assert bucket.try_acquire()[0] is False
+
+    fake_clock.now += 1
+    assert bucket.try_acquire() == (True, 0)
+    assert bucket.try_acquire()[0] is False
+
+
+def test_bucket_never_exceeds_capacity(fake_clock):
+    bucket = TokenBucket(3)
+    fake_clock.now += 3600
+    assert sum(bucket.try_acquire()[0] for _ in range(10)) == 3
+
+
+def test_keys_have_separate_buckets(fake_clock):
+    limiter = KeyedRateLimiter(2)
+    assert limiter.try_acquire('a')[0] and limiter.try_acquire('a')[0]
+    assert limiter.try_acquire('a')[0] is False
+    assert limiter.try_acquire('b')[0] is True
+
+
+def test_zero_rate_disables_limit(fake_clock):
+    limiter = KeyedRateLimiter(0)
+    assert all(limiter.try_acquire('a') == (True, 0) for _ in range(100))
+    assert limiter.buckets == {}
+
+
+def test_full_buckets_are_evicted_at_key_limit(fake_clock):
+    limiter = KeyedRateLimiter(60, max_keys=3)
+    for key in ('a', 'b', 'c'):
+        limiter.try_acquire(key)
+
+    fake_clock.now += 60
+    limiter.try_acquire('d')
+    assert set(limiter.buckets) == {'d'}
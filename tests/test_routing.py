@@ -0,0 +1,63 @@
+import pytest
+
+from jira_time_tracker import routing
+from jira_time_tracker.routing import ChannelRouter, describe_rule, validate_rule
+
+TASK = {'projekt': 'PROJ', 'zadanie': 'PROJ-1'}
+
+
+def test_exact_channel_wins_over_rules():
+    router = ChannelRouter({'1': TASK}, [{'issue_key_in_name': True}])
+    assert router.resolve(1, 'OTHER-5') == TASK
+
+
+def test_first_matching_rule_wins():
+    router = ChannelRouter({}, [
+        {'category_id': 10, 'projekt': 'A', 'zadanie': 'A-1'},
+        {'name_pattern': '^standup', 'projekt': 'B', 'zadanie': 'B-1'},
+    ])
+    assert router.resolve('2', 'Standup zespołu', 10)['zadanie'] == 'A-1'
+    assert router.resolve('3', 'Standup zespołu', 11)['zadanie'] == 'B-1'
+    assert router.resolve('4', 'Inny kanał', 11) is None
+
+
+def test_issue_key_is_read_from_channel_name():
+    router = ChannelRouter({}, [{'issue_key_in_name': True}])
+    assert dict(router.resolve('5', 'Przegląd ABC_2-42')) == {'projekt': 'ABC_2', 'zadanie': 'ABC_2-42'}
+    assert router.resolve('6', 'bez klucza') is None
+
+
+@pytest.mark.parametrize('name', ['Room-1', 'call-2', 'proj-3 przegląd', 'xPROJ-4'])
+def test_lowercase_names_are_not_issue_keys(name):
+    router = ChannelRouter({}, [{'issue_key_in_name': True}])
+    assert router.resolve('8', name) is None
+
+
+def test_results_are_cached_per_channel():
+    router = ChannelRouter({}, [{'category_id': 10, 'projekt': 'A', 'zadanie': 'A-1'}])
+    first = router.resolve('7', 'x', 10)
+    assert router.resolve('7', 'x', 10) is first
+    assert ('7', 'x', '10') in router.cache
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(routing, 'ROUTE_CACHE_SIZE', 10)
+    router = ChannelRouter({}, [{'issue_key_in_name': True}])
+    for channel_id in range(25):
+        router.resolve(channel_id, f"PROJ-{channel_id}")
+    assert len(router.cache) <= 10
+
+
+@pytest.mark.parametrize('rule', [
+    'reguła',
+    {'projekt': 'A', 'zadanie': 'A-1'},
+    {'category_id': 1},
+    {'name_pattern': '(', 'projekt': 'A', 'zadanie': 'A-1'},
+])
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(ValueError):
+        validate_rule(0, rule)
+
+
+def test_describe_rule():
+    assert describe_rule({'category_id': 1, 'issue_key_in_name': True}) == "kategoria 1 -> zadanie z nazwy kanału"
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from jira_time_tracker import storage
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'TASKS_FILE', str(tmp_path / 'tasks.json'))
+    monkeypatch.setattr(storage, 'CONFIG_FILE', str(tmp_path / 'config.json'))
+    return tmp_path
+
+
+def write(path, data):
+    path.write_text(data if isinstance(data, str) else json.dumps(data), encoding='utf-8')
+
+
+def test_startup_skips_only_invalid_tasks(files):
+    write(files / 'tasks.json', {'1': {'projekt': 'PROJ', 'zadanie': 'PROJ-1'}, '2': {'projekt': 'PROJ'}, '3': 'PROJ-3'})
+    assert storage.load_tasks() == {'1': {'projekt': 'PROJ', 'zadanie': 'PROJ-1'}}
+
+
+def test_reload_rejects_file_with_invalid_task(files):
+    write(files / 'tasks.json', {'1': {'projekt': 'PROJ', 'zadanie': 'PROJ-1'}, '2': {'projekt': 'PROJ'}})
+    with pytest.raises(ValueError):
+        storage.read_tasks_file()
+
+
+def test_startup_skips_only_invalid_config_entries(files):
+    write(files / 'config.json', {
+        'user_mappings': {'1': 'acc', '2': 5},
+        'channel_rules': [{'issue_key_in_name': True}, {'category_id': '9'}],
+    })
+    config = storage.load_config()
+    assert config['user_mappings'] == {'1': 'acc'}
+    assert config['channel_rules'] == [{'issue_key_in_name': True}]
+
+
+@pytest.mark.parametrize('name, load', [('tasks.json', storage.load_tasks), ('config.json', storage.load_config)])
+def test_unreadable_file_stops_startup(files, name, load):
+    # Pusty stan zamiast pliku oznaczałby skasowanie wszystkich mapowań przy pierwszym zapisie
+    write(files / name, '{"1": {"projekt": ')
+    with pytest.raises(RuntimeError):
+        load()
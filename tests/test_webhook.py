@@ -0,0 +1,78 @@
+import pytest
+
+from jira_time_tracker import webhook
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(webhook, 'WEBHOOK_TOKEN', '')
+    monkeypatch.setattr(webhook.recorder, 'record_webhook', lambda *args: None)
+    webhook.stats.clear()
+    return webhook.app.test_client()
+
+
+def post(client, body):
+    return client.post('/webhook/voice-activity', data=body, content_type='application/json')
+
+
+@pytest.mark.parametrize('duration', ['0', '-5', '1e12', '1441', 'NaN', 'Infinity', '-Infinity', 'true', '"30"', 'null'])
+def test_invalid_duration_is_rejected(client, duration):
+    response = post(client, f'{{"user_id": "1", "channel_id": "2", "duration_minutes": {duration}}}')
+    assert response.status_code == 400
+    assert webhook.stats['rejected_invalid'] == 1
+
+
+def test_non_object_body_is_rejected(client):
+    assert post(client, '[1, 2]').status_code == 400
+    assert webhook.stats['rejected_invalid'] == 1
+
+
+@pytest.mark.parametrize('user', ['"user_id": [1]', '"user_id": {"id": 1}', '"user_id": true', '"user_name": 5'])
+def test_invalid_user_is_rejected(client, user):
+    response = post(client, f'{{{user}, "channel_id": "2", "duration_minutes": 30}}')
+    assert response.status_code == 400
+    assert webhook.stats['rejected_invalid'] == 1
+
+
+def test_numeric_user_id_matches_mapping(client, monkeypatch):
+    entries = []
+
+    async def localize(entry):
+        return entry
+
+    async def submit_worklog(entry):
+        entries.append(entry)
+
+    snapshot = webhook.storage.build_snapshot({'2': {'projekt': 'PROJ', 'zadanie': 'PROJ-1'}}, {'123': 'acc'})
+    monkeypatch.setattr(webhook.storage, 'snapshot', snapshot)
+    monkeypatch.setattr(webhook.timezones, 'localize', localize)
+    monkeypatch.setattr(webhook.backends, 'submit_worklog', submit_worklog)
+    monkeypatch.setattr(webhook.aggregation, 'ENABLED', False)
+
+    response = post(client, '{"user_id": 123, "channel_id": 2, "duration_minutes": 30}')
+    assert response.status_code == 200
+    assert entries[0].jira_account_id == 'acc'
+
+
+@pytest.mark.parametrize('fields', [
+    '"channel_name": 5', '"channel_name": ["a"]', '"category_id": [1]', '"guild_id": {"id": 1}',
+    '"category_id": false', '"channel_id": 1.5',
+])
+def test_invalid_channel_fields_are_rejected(client, monkeypatch, fields):
+    rules = [{'name_pattern': '^standup', 'projekt': 'OPS', 'zadanie': 'OPS-1'}]
+    monkeypatch.setattr(webhook.storage, 'snapshot', webhook.storage.build_snapshot({}, {}, rules))
+    body = json_body('{"channel_id": "2", "duration_minutes": 30}', fields)
+    response = post(client, body)
+    assert response.status_code == 400
+    assert response.is_json
+    assert webhook.stats['rejected_invalid'] == 1
+
+
+def test_missing_channel_id_is_rejected(client):
+    assert post(client, '{"duration_minutes": 30}').status_code == 400
+    assert webhook.stats['rejected_invalid'] == 1
+
+
+def json_body(base, fields):
+    """Dopisz pola do obiektu JSON (późniejsze nadpisują wcześniejsze)"""
+    return base[:-1] + ', ' + fields + '}'
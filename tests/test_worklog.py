@@ -0,0 +1,113 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from jira_time_tracker.backends import StubBackend
+from jira_time_tracker.simulate import BOUNDARY_OFFSETS, simulate, synthetic_sessions
+from jira_time_tracker.worklog import (
+    MIN_WORKLOG_MINUTES, TIME_SPENT_PATTERN, build_entry, format_time_spent, parse_time_spent, worklog_minutes
+)
+
+# Testy własności: losowe czasy (ze stałym ziarnem) oraz czasy wokół granic zaokrągleń
+
+START = datetime(2024, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def sample_minutes(count, seed=0):
+    """Losowe czasy w minutach: dowolne oraz tuż przy pełnej i pół minucie"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        whole = rng.randrange(0, 24 * 60)
+        yield rng.uniform(0, 24 * 60)
+        yield whole + rng.choice(BOUNDARY_OFFSETS) / 60
+
+
+@pytest.mark.parametrize('minutes, expected', [
+    (0, "1m"), (0.49, "1m"), (1.49, "1m"), (1.5, "2m"), (59.5, "1h"), (60, "1h"),
+    (61, "1h 1m"), (150, "2h 30m"), (1440, "24h"),
+])
+def test_format_time_spent(minutes, expected):
+    assert format_time_spent(minutes) == expected
+
+
+@pytest.mark.parametrize('time_spent', ["", "1h ", " 1m", "30", "m", "1 h", "1.5h", "-1m", "1m 1h"])
+def test_parse_time_spent_rejects_invalid_format(time_spent):
+    with pytest.raises(ValueError):
+        parse_time_spent(time_spent)
+
+
+def test_format_parse_round_trip():
+    for minutes in sample_minutes(20000):
+        time_spent = format_time_spent(minutes)
+        assert TIME_SPENT_PATTERN.match(time_spent), time_spent
+        assert parse_time_spent(time_spent) == worklog_minutes(minutes)
+
+
+def test_parse_format_round_trip_for_whole_minutes():
+    for minutes in range(1, 48 * 60):
+        assert parse_time_spent(format_time_spent(minutes)) == minutes
+
+
+def test_rounding_stays_within_half_a_minute():
+    for minutes in sample_minutes(20000, seed=1):
+        rounded = worklog_minutes(minutes)
+        assert rounded >= MIN_WORKLOG_MINUTES
+        if minutes >= MIN_WORKLOG_MINUTES:
+            assert abs(rounded - minutes) <= 0.5
+
+
+def test_rounding_is_monotonic():
+    previous = 0
+    for minutes in sorted(sample_minutes(5000, seed=2)):
+        rounded = worklog_minutes(minutes)
+        assert rounded >= previous
+        previous = rounded
+
+
+def test_build_entry_keeps_end_time_consistent():
+    rng = random.Random(3)
+    for _ in range(1000):
+        seconds = rng.uniform(6, 10 * 3600)
+        entry = build_entry('PROJ-1', START, seconds, 'acc', 'bob', 'kanał')
+        assert entry.duration_seconds == round(seconds)
+        assert entry.end_time - entry.start_time == timedelta(seconds=entry.duration_seconds)
+
+
+def test_totals_are_conserved():
+    backend = StubBackend()
+    expected = {}
+    exact_minutes = 0.0
+    allowed_error = 0.0
+    sessions = list(synthetic_sessions(5000, seed=4, issues=5, users=5))
+    for issue_key, user, start_time, seconds in sessions:
+        entry = build_entry(issue_key, start_time, seconds, user, user, 'kanał')
+        logged = backend.record(entry)
+        expected[(issue_key, user)] = expected.get((issue_key, user), 0) + logged
+        minutes = entry.duration_seconds / 60
+        exact_minutes += minutes
+        # Błąd zaokrąglenia to najwyżej pół minuty; krótsze sesje są podnoszone do minimum
+        allowed_error += 0.5 if minutes >= MIN_WORKLOG_MINUTES else MIN_WORKLOG_MINUTES - minutes
+
+    assert backend.totals == expected
+    assert len(backend.entries) == len(sessions)
+    assert abs(sum(backend.totals.values()) - exact_minutes) <= allowed_error
+
+
+def test_simulation_finds_no_errors(capsys):
+    assert simulate(2000, seed=5) == []
+
+
+def test_benchmark_build_and_record():
+    """Pomiar przepustowości budowania worklogów; próg jest daleko poniżej typowego wyniku"""
+    backend = StubBackend(keep_entries=False)
+    sessions = list(synthetic_sessions(50000, seed=6))
+
+    started = time.perf_counter()
+    for issue_key, user, start_time, seconds in sessions:
+        backend.record(build_entry(issue_key, start_time, seconds, user, user, 'kanał'))
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(sessions) / elapsed:,.0f} worklogów/s")
+    assert len(sessions) / elapsed > 5000